@@ -16,6 +16,10 @@ class Config:
     POSTGRES_DB = os.getenv("POSTGRES_DB", "stem_kg")
     POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
     POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "password")
+    SQLALCHEMY_QUERY_CACHE_SIZE = int(os.getenv("SQLALCHEMY_QUERY_CACHE_SIZE", "1200"))
+    SQLALCHEMY_POOL_SIZE = int(os.getenv("SQLALCHEMY_POOL_SIZE", "10"))
+    SQLALCHEMY_MAX_OVERFLOW = int(os.getenv("SQLALCHEMY_MAX_OVERFLOW", "20"))
+    SQLALCHEMY_POOL_RECYCLE = int(os.getenv("SQLALCHEMY_POOL_RECYCLE", "3600"))
 
     # Auth PostgreSQL (middleware etechs_global)
     AUTH_POSTGRES_HOST = os.getenv("AUTH_POSTGRES_HOST", POSTGRES_HOST)
@@ -30,11 +34,20 @@ class Config:
     MONGO_DB = os.getenv("MONGO_DB", "stem_kg")
     MONGO_USER = os.getenv("MONGO_USER", "")
     MONGO_PASSWORD = os.getenv("MONGO_PASSWORD", "")
+    QUERY_LOG_TTL_DAYS = int(os.getenv("QUERY_LOG_TTL_DAYS", "7"))
+    MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,zlib")
+    MONGO_ZLIB_COMPRESSION_LEVEL = int(os.getenv("MONGO_ZLIB_COMPRESSION_LEVEL", "3"))
     
     # Neo4j
     NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
     NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
     NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
+    NEO4J_MAX_CONNECTION_POOL_SIZE = int(os.getenv("NEO4J_MAX_CONNECTION_POOL_SIZE", "50"))
+    NEO4J_MAX_CONNECTION_LIFETIME = int(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "60"))
+    NEO4J_MAX_TRANSACTION_RETRY_TIME = float(os.getenv("NEO4J_MAX_TRANSACTION_RETRY_TIME", "15"))
+    NEO4J_WRITE_BATCH_SIZE = int(os.getenv("NEO4J_WRITE_BATCH_SIZE", "500"))
+    NEO4J_WRITE_BATCH_DELAY_MS = int(os.getenv("NEO4J_WRITE_BATCH_DELAY_MS", "50"))
     
     # App
     APP_TITLE = "STEM Knowledge Graph API"
@@ -1,6 +1,6 @@
 # app/database/__init__.py
 from .postgres_conn import get_postgres_db
 from .mongo_conn import get_mongo_db
-from .neo4j_conn import get_neo4j_session
+from .neo4j_conn import get_neo4j_session, get_neo4j_driver, close_neo4j_driver, create_neo4j_async_driver
 
 # Hoặc để trống nếu không cần
\ No newline at end of file
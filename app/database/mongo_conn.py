@@ -12,7 +12,13 @@ class MongoDB:
         else:
             connection_string = f"mongodb://{config.MONGO_HOST}:{config.MONGO_PORT}"
         
-        cls.client = MongoClient(connection_string)
+        # Wire compression is negotiated with the server; falls back to
+        # uncompressed if none of the listed compressors is supported.
+        cls.client = MongoClient(
+            connection_string,
+            compressors=config.MONGO_COMPRESSORS,
+            zlibCompressionLevel=config.MONGO_ZLIB_COMPRESSION_LEVEL
+        )
         cls.db = cls.client[config.MONGO_DB]
     
     @classmethod
@@ -25,6 +31,8 @@ class MongoDB:
     def close(cls):
         if cls.client:
             cls.client.close()
+        cls.client = None
+        cls.db = None
 
 def get_mongo_db():
     return MongoDB.get_db()
\ No newline at end of file
@@ -1,4 +1,4 @@
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, AsyncGraphDatabase
 from app.config import config
 
 class Neo4jConnection:
@@ -9,7 +9,11 @@ class Neo4jConnection:
             cls._instance = super(Neo4jConnection, cls).__new__(cls)
             cls._instance.driver = GraphDatabase.driver(
                 config.NEO4J_URI,
-                auth=(config.NEO4J_USER, config.NEO4J_PASSWORD)
+                auth=(config.NEO4J_USER, config.NEO4J_PASSWORD),
+                max_connection_pool_size=config.NEO4J_MAX_CONNECTION_POOL_SIZE,
+                max_connection_lifetime=config.NEO4J_MAX_CONNECTION_LIFETIME,
+                connection_acquisition_timeout=config.NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+                max_transaction_retry_time=config.NEO4J_MAX_TRANSACTION_RETRY_TIME
             )
         return cls._instance
     
@@ -20,6 +24,26 @@ class Neo4jConnection:
         if self.driver:
             self.driver.close()
 
+def get_neo4j_driver():
+    return Neo4jConnection().driver
+
+def create_neo4j_async_driver():
+    """New async driver with the same settings; the caller owns it and must close it in its event loop"""
+    return AsyncGraphDatabase.driver(
+        config.NEO4J_URI,
+        auth=(config.NEO4J_USER, config.NEO4J_PASSWORD),
+        max_connection_pool_size=config.NEO4J_MAX_CONNECTION_POOL_SIZE,
+        max_connection_lifetime=config.NEO4J_MAX_CONNECTION_LIFETIME,
+        connection_acquisition_timeout=config.NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+        max_transaction_retry_time=config.NEO4J_MAX_TRANSACTION_RETRY_TIME
+    )
+
+def close_neo4j_driver():
+    """Close the shared driver (app shutdown); the next call reconnects"""
+    if Neo4jConnection._instance is not None:
+        Neo4jConnection._instance.close()
+        Neo4jConnection._instance = None
+
 def get_neo4j_session():
     connection = Neo4jConnection()
     return connection.get_session()
\ No newline at end of file
@@ -6,7 +6,19 @@ from app.config import config
 
 SQLALCHEMY_DATABASE_URL = f"postgresql://{config.POSTGRES_USER}:{config.POSTGRES_PASSWORD}@{config.POSTGRES_HOST}:{config.POSTGRES_PORT}/{config.POSTGRES_DB}"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# The one pooled engine for the process: PostgresService and every other
+# consumer must get their sessions from SessionLocal / get_postgres_db.
+# values_plus_batch: executemany INSERTs become multi-VALUES statements and
+# executemany UPDATE/DELETE go through psycopg2 execute_batch (pages, not row by row)
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    executemany_mode="values_plus_batch",
+    pool_size=config.SQLALCHEMY_POOL_SIZE,
+    max_overflow=config.SQLALCHEMY_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=config.SQLALCHEMY_POOL_RECYCLE,
+    query_cache_size=config.SQLALCHEMY_QUERY_CACHE_SIZE
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
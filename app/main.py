@@ -3,10 +3,17 @@ from fastapi import Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
+import logging
 from app.config import config
+from app.responses import APIJSONResponse
 from app.database.postgres_conn import engine, Base
+from app.database.neo4j_conn import close_neo4j_driver
+from app.database.mongo_conn import MongoDB
 from app.models.postgres_models import User
 from app.services.token_auth import get_current_user
+from app.services.neo4j_service import Neo4jService
+from app.services.neo4j_batch_writer import neo4j_batch_writer
+from app.services.mongo_service import MongoService
 
 from app.routes import (
     postgres_routes,
@@ -18,9 +25,12 @@ from app.routes import (
     entity_routes
 )
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title=config.APP_TITLE,
-    version=config.APP_VERSION
+    version=config.APP_VERSION,
+    default_response_class=APIJSONResponse
 )
 
 # Create all tables
@@ -50,6 +60,36 @@ app.include_router(search_routes.router, prefix=config.API_PREFIX, dependencies=
 app.include_router(auth_routes.router, prefix=config.API_PREFIX)
 app.include_router(entity_routes.router, prefix=config.API_PREFIX, dependencies=[Depends(get_current_user)])
 
+@app.on_event("startup")
+def ensure_database_indexes():
+    neo4j_service = Neo4jService()
+    try:
+        neo4j_service.ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Neo4j index bootstrap skipped: {e}")
+    finally:
+        neo4j_service.close()
+
+    try:
+        MongoService().ensure_indexes()
+    except Exception as e:
+        logger.warning(f"MongoDB index bootstrap skipped: {e}")
+
+@app.on_event("startup")
+async def start_neo4j_batch_writer():
+    await neo4j_batch_writer.start()
+
+@app.on_event("shutdown")
+async def stop_neo4j_batch_writer():
+    # Drain pending batched writes before the driver pools are closed
+    await neo4j_batch_writer.stop()
+
+@app.on_event("shutdown")
+def close_database_connections():
+    # Connection pools are shared for the whole process; release them once here
+    close_neo4j_driver()
+    MongoDB.close()
+
 @app.get("/")
 def read_root():
     return {
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, JSON, DateTime, ForeignKey, DECIMAL, UUID
+from sqlalchemy import Column, Integer, String, Text, Boolean, JSON, DateTime, ForeignKey, DECIMAL, UUID, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship as orm_relationship 
 from app.database.postgres_conn import Base
@@ -30,6 +30,9 @@ class RootCategory(Base):
 
 class Category(Base):
     __tablename__ = "categories"
+    __table_args__ = (
+        Index("idx_categories_root_category_id", "root_category_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String(50), unique=True, index=True)
@@ -45,6 +48,9 @@ class Category(Base):
 
 class Diagram(Base):
     __tablename__ = "diagrams"
+    __table_args__ = (
+        Index("idx_diagrams_category_id", "category_id"),
+    )
     
     id = Column(String(50), primary_key=True)
     category_id = Column(Integer, ForeignKey("categories.id"))
@@ -68,6 +74,9 @@ class Diagram(Base):
 
 class RootSubject(Base):
     __tablename__ = "root_subjects"
+    __table_args__ = (
+        Index("idx_root_subjects_level", "level"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String(50), unique=True, index=True)
@@ -81,6 +90,10 @@ class RootSubject(Base):
 
 class Subject(Base):
     __tablename__ = "subjects"
+    __table_args__ = (
+        # (root_subject_id, id) also serves the ORDER BY of per-root paging
+        Index("idx_subjects_root_subject_id_id", "root_subject_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String(50), unique=True, index=True)
@@ -93,8 +106,19 @@ class Subject(Base):
     
     root_subject = orm_relationship("RootSubject", back_populates="subjects")
 
+# Functional index for prefix search (lower(name) LIKE 'abc%'); declared after the
+# class because it needs the mapped column
+Index(
+    "idx_subjects_lower_name",
+    func.lower(Subject.name).label("lower_name"),
+    postgresql_ops={"lower_name": "text_pattern_ops"}
+)
+
 class Relationship(Base):
     __tablename__ = "relationships"
+    __table_args__ = (
+        Index("idx_relationships_semantic_type", "semantic_type"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String(50), unique=True, index=True)
@@ -106,6 +130,12 @@ class Relationship(Base):
 
 class SubjectRelationshipObject(Base):
     __tablename__ = "subject_relationship_object"
+    __table_args__ = (
+        Index("idx_sro_subject_id", "subject_id"),
+        Index("idx_sro_relationship_id", "relationship_id"),
+        Index("idx_sro_object_id", "object_id"),
+        Index("idx_sro_diagram_id", "diagram_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     subject_id = Column(Integer, ForeignKey("subjects.id"))
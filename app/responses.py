@@ -0,0 +1,40 @@
+# app/responses.py
+from decimal import Decimal
+from typing import Any, Iterable, Iterator
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+
+
+def _orjson_default(value: Any) -> Any:
+    """Serialize types orjson does not handle natively"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    # neo4j.time.DateTime / Date / Time expose iso_format()
+    if hasattr(value, "iso_format"):
+        return value.iso_format()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class APIJSONResponse(ORJSONResponse):
+    """Default response class: orjson with ObjectId / Neo4j temporal / Decimal support"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
+def ndjson_lines(rows: Iterable[Any]) -> Iterator[bytes]:
+    """Encode rows one JSON document per line, for StreamingResponse"""
+    for row in rows:
+        yield orjson.dumps(
+            dict(row),
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE,
+        )
@@ -4,6 +4,7 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 import os
 import re
+import logging
 import json
 import uuid
 import time
@@ -11,6 +12,7 @@ import requests
 import unicodedata
 from datetime import datetime
 from urllib.parse import quote_plus
+from neo4j.exceptions import Neo4jError, DriverError
 
 from app.services.integration_service import IntegrationService
 from app.database.postgres_conn import get_postgres_db
@@ -22,6 +24,7 @@ from app.schemas.mongo_schemas import SemanticRelationshipCreate
 from app.config import config
 
 router = APIRouter(prefix="/integration", tags=["Integration"])
+logger = logging.getLogger(__name__)
 
 VI_EN_PHRASE_MAP = {
     "hay cho toi biet": "tell me",
@@ -368,28 +371,10 @@ def _select_by_neo4j_textlabels(
     if not lookup_keys:
         return []
 
-    cypher = """
-    UNWIND $keys AS lookup_key
-    MATCH (tl)
-    WHERE (
-            any(lbl IN labels(tl) WHERE toLower(lbl) = 'textlabel')
-            OR toLower(coalesce(tl.type, '')) IN ['text_label', 'textlabel']
-        )
-        AND (
-            toLower(coalesce(tl.diagram_id, tl.diagramId, tl.image_id, tl.imageId, '')) = lookup_key
-            OR replace(toLower(coalesce(tl.diagram_id, tl.diagramId, tl.image_id, tl.imageId, '')), '.png', '') = lookup_key
-            OR replace(toLower(coalesce(tl.diagram_id, tl.diagramId, tl.image_id, tl.imageId, '')), '.jpg', '') = lookup_key
-            OR replace(toLower(coalesce(tl.diagram_id, tl.diagramId, tl.image_id, tl.imageId, '')), '.jpeg', '') = lookup_key
-        )
-    RETURN coalesce(tl.diagram_id, tl.diagramId, tl.image_id, tl.imageId, '') AS diagram_id,
-                 coalesce(tl.value, tl.text, tl.label, tl.name, '') AS value,
-                 coalesce(tl.replacement_text, tl.replacementText, '') AS replacement_text,
-                 coalesce(tl.category, tl.category_name, tl.categoryName, '') AS category
-    """
-
     try:
-        records = neo4j_service.session.run(cypher, keys=lookup_keys)
-    except Exception:
+        records = neo4j_service.get_text_labels_by_diagram_keys(lookup_keys)
+    except (Neo4jError, DriverError) as e:
+        logger.warning(f"Text label lookup by diagram failed: {e}")
         return []
 
     diagram_scores: Dict[str, float] = {}
@@ -464,28 +449,10 @@ def _search_diagrams_by_subject_textlabels_global(
     if not terms:
         return []
 
-    cypher = """
-    MATCH (tl)
-    WHERE (
-        any(lbl IN labels(tl) WHERE toLower(lbl) = 'textlabel')
-        OR toLower(coalesce(tl.type, '')) IN ['text_label', 'textlabel']
-    )
-    WITH tl,
-         toLower(trim(coalesce(tl.diagram_id, tl.diagramId, tl.image_id, tl.imageId, ''))) AS diagram_id,
-         toLower(trim(
-            coalesce(tl.value, '') + ' ' +
-            coalesce(tl.replacement_text, '') + ' ' +
-            coalesce(tl.text, '') + ' ' +
-            coalesce(tl.label, '') + ' ' +
-            coalesce(tl.name, '')
-         )) AS text_blob
-    WHERE diagram_id <> '' AND text_blob <> ''
-    RETURN diagram_id, text_blob
-    """
-
     try:
-        records = neo4j_service.session.run(cypher)
-    except Exception:
+        records = neo4j_service.get_text_label_blobs()
+    except (Neo4jError, DriverError) as e:
+        logger.warning(f"Global text label search failed: {e}")
         return []
 
     query_blob = _normalize_label(normalized_query_text or "")
@@ -574,28 +541,10 @@ def _search_diagram_by_required_subject_terms(
     if len(terms) < 2:
         return []
 
-    cypher = """
-    MATCH (tl)
-    WHERE (
-        any(lbl IN labels(tl) WHERE toLower(lbl) = 'textlabel')
-        OR toLower(coalesce(tl.type, '')) IN ['text_label', 'textlabel']
-    )
-    WITH tl,
-         toLower(trim(coalesce(tl.diagram_id, tl.diagramId, tl.image_id, tl.imageId, ''))) AS diagram_id,
-         toLower(trim(
-            coalesce(tl.value, '') + ' ' +
-            coalesce(tl.replacement_text, '') + ' ' +
-            coalesce(tl.text, '') + ' ' +
-            coalesce(tl.label, '') + ' ' +
-            coalesce(tl.name, '')
-         )) AS text_blob
-    WHERE diagram_id <> '' AND text_blob <> ''
-    RETURN diagram_id, text_blob
-    """
-
     try:
-        records = neo4j_service.session.run(cypher)
-    except Exception:
+        records = neo4j_service.get_text_label_blobs()
+    except (Neo4jError, DriverError) as e:
+        logger.warning(f"Text label coverage search failed: {e}")
         return []
 
     coverage: Dict[str, set] = {}
@@ -1683,9 +1632,10 @@ def _query_databases(
     neo4j_results = neo4j_service.search_diagrams_by_triple(subject, relationship, object_value)
     diagram_ids = [r.get("diagram_id") for r in neo4j_results if r.get("diagram_id")]
 
+    annotations_by_diagram = mongo_service.get_annotations_by_diagrams(diagram_ids)
     mongo_annotations: List[Dict[str, Any]] = []
     for diagram_id in diagram_ids:
-        annotations = mongo_service.get_annotations_by_diagram(diagram_id)
+        annotations = annotations_by_diagram.get(diagram_id)
         if annotations:
             mongo_annotations.extend(annotations)
 
@@ -2858,9 +2808,10 @@ def get_sro_details(
         if not sro:
             raise HTTPException(status_code=404, detail="SRO not found")
         
-        subject = postgres_service.get_subject(sro.subject_id)
+        subjects = {s.id: s for s in postgres_service.get_subjects_by_ids([sro.subject_id, sro.object_id])}
+        subject = subjects.get(sro.subject_id)
         relationship = postgres_service.get_relationship(sro.relationship_id)
-        obj = postgres_service.get_subject(sro.object_id)
+        obj = subjects.get(sro.object_id)
         
         code = f"{subject.code}_{relationship.code}_{obj.code}"
         
@@ -72,4 +72,16 @@ def search_by_category(category: str):
         annotations = service.search_annotations_by_category(category)
         return annotations
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/stats/annotations", response_model=Dict[str, Any])
+def get_annotation_stats():
+    """Thống kê số lượng annotations (tổng và theo category)"""
+    service = MongoService()
+    try:
+        return {
+            "total": service.count_annotations(),
+            "by_category": service.count_annotations_by_category()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,9 +1,10 @@
 # app/routes/neo4j_routes.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 
 from app.services.neo4j_service import Neo4jService
+from app.services.neo4j_batch_writer import neo4j_batch_writer
 from app.schemas.neo4j_schemas import NodeCreate, RelationshipCreate, NodeUpdateByKey
 from app.schemas import postgres_schemas as pg_schemas
 from app.database.postgres_conn import get_postgres_db
@@ -37,18 +38,86 @@ def create_relationship(rel_data: RelationshipCreate):
     finally:
         service.close()
 
+@router.post("/nodes/bulk", response_model=Dict[str, Any])
+def create_nodes_bulk(nodes: List[NodeCreate]):
+    """Tạo nhiều STEM_NODE trong một lần gọi"""
+    service = Neo4jService()
+    try:
+        result = service.create_nodes_bulk(nodes)
+        return {"success": True, "count": len(result), "nodes": result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        service.close()
+
+@router.post("/nodes/queued", response_model=Dict[str, Any])
+async def create_node_queued(node_data: NodeCreate):
+    """Tạo/cập nhật node (MERGE theo id) qua hàng đợi ghi theo lô"""
+    try:
+        node = await neo4j_batch_writer.submit(node_data)
+        return {"success": True, "node": node}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/relationships/bulk", response_model=Dict[str, Any])
+def create_relationships_bulk(relationships: List[RelationshipCreate]):
+    """Tạo nhiều relationship trong một lần gọi"""
+    service = Neo4jService()
+    try:
+        result = service.create_relationships_bulk(relationships)
+        return {"success": True, "count": len(result), "relationships": result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        service.close()
+
 @router.get("/nodes/", response_model=List[Dict[str, Any]])
-def get_all_nodes(limit: int = 100, label: str = None):
-    """Lấy tất cả nodes (tuỳ chọn theo label)"""
+def get_all_nodes(limit: int = 100, label: str = None, fields: Optional[List[str]] = Query(None)):
+    """Lấy tất cả nodes (tuỳ chọn theo label, chỉ lấy các thuộc tính trong fields)"""
     service = Neo4jService()
     try:
-        nodes = service.get_all_nodes(limit, label)
+        nodes = service.get_all_nodes(limit, label, fields)
         return nodes
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         service.close()
 
+@router.get("/nodes/page", response_model=Dict[str, Any])
+def get_nodes_page(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), label: str = "STEM_NODE"):
+    """Lấy nodes theo trang (keyset theo id); truyền next_cursor để lấy trang tiếp"""
+    service = Neo4jService()
+    try:
+        return service.get_all_nodes_paginated(cursor, limit, label)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        service.close()
+
+@router.post("/nodes/by-ids", response_model=Dict[str, Dict[str, Any]])
+def get_nodes_by_ids(node_ids: List[str]):
+    """Lấy nhiều STEM_NODE theo danh sách id trong một lần gọi"""
+    service = Neo4jService()
+    try:
+        return service.get_nodes_by_ids(node_ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        service.close()
+
+@router.post("/nodes/by-keys", response_model=Dict[str, Dict[str, Any]])
+def get_nodes_by_keys(label: str, key: str, values: List[str]):
+    """Lấy nhiều node theo label + key cho danh sách value trong một lần gọi"""
+    service = Neo4jService()
+    try:
+        return service.get_nodes_by_keys(label, key, values)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        service.close()
+
 @router.get("/nodes/{node_id}", response_model=Dict[str, Any])
 def get_node(node_id: str):
     """Lấy node bằng ID"""
@@ -674,4 +743,8 @@ def create_subject_relationship_endpoint(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
-        neo4j_service.close()
\ No newline at end of file
+        neo4j_service.close()
+@router.get("/cache/stats", response_model=Dict[str, Any])
+def get_search_cache_stats():
+    """Thống kê cache kết quả tìm kiếm (hit/miss, kích thước)"""
+    return Neo4jService.cache_stats()
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 
-from app.database.postgres_conn import get_postgres_db
+from app.database.postgres_conn import get_postgres_db, get_session
+from app.responses import ndjson_lines
 from app.services.postgres_service import PostgresService
 from app.schemas import postgres_schemas as schemas
 
@@ -18,6 +20,15 @@ def create_root_category(
     result = service.create_root_category(category)
     return schemas.RootCategoryResponse.model_validate(result)
 
+@router.post("/root-categories/bulk", response_model=List[schemas.RootCategoryResponse])
+def create_root_categories_bulk(
+    categories: List[schemas.RootCategoryCreate],
+    db: Session = Depends(get_postgres_db)
+):
+    service = PostgresService(db)
+    result = service.create_root_categories_bulk(categories)
+    return [schemas.RootCategoryResponse.model_validate(item) for item in result]
+
 @router.get("/root-categories/", response_model=List[schemas.RootCategoryResponse])
 def get_all_root_categories(db: Session = Depends(get_postgres_db)):
     service = PostgresService(db)
@@ -70,14 +81,27 @@ def create_category(
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
+@router.post("/categories/bulk", response_model=List[schemas.CategoryResponse])
+def create_categories_bulk(
+    categories: List[schemas.CategoryCreate],
+    db: Session = Depends(get_postgres_db)
+):
+    service = PostgresService(db)
+    try:
+        result = service.create_categories_bulk(categories)
+        return [schemas.CategoryResponse.model_validate(item) for item in result]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
 @router.get("/categories/", response_model=List[schemas.CategoryResponse])
 def get_all_categories(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    after_id: Optional[int] = Query(None, description="Last id of the previous page (keyset paging)"),
     db: Session = Depends(get_postgres_db)
 ):
     service = PostgresService(db)
-    result = service.get_all_categories(skip=skip, limit=limit)
+    result = service.get_all_categories(skip=skip, limit=limit, after_id=after_id)
     return [schemas.CategoryResponse.model_validate(item) for item in result]
 
 @router.get("/categories/{category_id}", response_model=schemas.CategoryResponse)
@@ -135,14 +159,24 @@ def create_diagram(
     result = service.create_diagram(diagram)
     return schemas.DiagramResponse.model_validate(result)
 
+@router.post("/diagrams/bulk", response_model=List[schemas.DiagramResponse])
+def create_diagrams_bulk(
+    diagrams: List[schemas.DiagramCreate],
+    db: Session = Depends(get_postgres_db)
+):
+    service = PostgresService(db)
+    result = service.create_diagrams_bulk(diagrams)
+    return [schemas.DiagramResponse.model_validate(item) for item in result]
+
 @router.get("/diagrams/", response_model=List[schemas.DiagramResponse])
 def get_all_diagrams(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    after_id: Optional[str] = Query(None, description="Last id of the previous page (keyset paging)"),
     db: Session = Depends(get_postgres_db)
 ):
     service = PostgresService(db)
-    result = service.get_all_diagrams(skip=skip, limit=limit)
+    result = service.get_all_diagrams(skip=skip, limit=limit, after_id=after_id)
     return [schemas.DiagramResponse.model_validate(item) for item in result]
 
 @router.get("/diagrams/{diagram_id}", response_model=schemas.DiagramResponse)
@@ -368,10 +402,11 @@ def create_root_subject(
 def get_all_root_subjects(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    after_id: Optional[int] = Query(None, description="Last id of the previous page (keyset paging)"),
     db: Session = Depends(get_postgres_db)
 ):
     service = PostgresService(db)
-    result = service.get_all_root_subjects(skip=skip, limit=limit)
+    result = service.get_all_root_subjects(skip=skip, limit=limit, after_id=after_id)
     return [schemas.RootSubjectResponse.model_validate(item) for item in result]
 
 @router.get("/root-subjects/{root_subject_id}", response_model=schemas.RootSubjectResponse)
@@ -429,15 +464,28 @@ def create_subject(
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
+@router.post("/subjects/bulk", response_model=List[schemas.SubjectResponse])
+def create_subjects_bulk(
+    subjects: List[schemas.SubjectCreate],
+    db: Session = Depends(get_postgres_db)
+):
+    service = PostgresService(db)
+    try:
+        result = service.create_subjects_bulk(subjects)
+        return [schemas.SubjectResponse.model_validate(item) for item in result]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
 @router.get("/subjects", response_model=Dict)
 @router.get("/subjects/", response_model=Dict)
 def get_all_subjects(
     skip: int = Query(0, ge=0),
     limit: int = Query(1000, ge=1, le=10000),
+    after_id: Optional[int] = Query(None, description="Last id of the previous page (keyset paging)"),
     db: Session = Depends(get_postgres_db)
 ):
     service = PostgresService(db)
-    subjects = service.get_all_subjects(skip=skip, limit=limit)
+    subjects = service.get_all_subjects(skip=skip, limit=limit, after_id=after_id)
     result = [schemas.SubjectResponse.model_validate(item) for item in subjects]
     return {"success": True, "data": result}
 
@@ -473,6 +521,16 @@ def search_subjects(
     result = service.search_subjects(name=name, root_subject_id=root_subject_id)
     return [schemas.SubjectResponse.model_validate(item) for item in result]
 
+@router.get("/subjects/search/prefix", response_model=List[schemas.SubjectResponse])
+def search_subjects_prefix(
+    prefix: str = Query(..., min_length=1, description="Name prefix"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_postgres_db)
+):
+    service = PostgresService(db)
+    result = service.search_subjects_prefix(prefix, limit=limit)
+    return [schemas.SubjectResponse.model_validate(item) for item in result]
+
 @router.put("/subjects/{subject_id}", response_model=schemas.SubjectResponse)
 def update_subject(
     subject_id: int = Path(..., ge=1, description="Subject ID"),
@@ -508,15 +566,25 @@ def create_relationship(
     result = service.create_relationship(relationship)
     return schemas.RelationshipResponse.model_validate(result)
 
+@router.post("/relationships/bulk", response_model=List[schemas.RelationshipResponse])
+def create_relationships_bulk(
+    relationships: List[schemas.RelationshipCreate],
+    db: Session = Depends(get_postgres_db)
+):
+    service = PostgresService(db)
+    result = service.create_relationships_bulk(relationships)
+    return [schemas.RelationshipResponse.model_validate(item) for item in result]
+
 @router.get("/relationships", response_model=Dict)
 @router.get("/relationships/", response_model=Dict)
 def get_all_relationships(
     skip: int = Query(0, ge=0),
     limit: int = Query(1000, ge=1, le=10000),
+    after_id: Optional[int] = Query(None, description="Last id of the previous page (keyset paging)"),
     db: Session = Depends(get_postgres_db)
 ):
     service = PostgresService(db)
-    relationships = service.get_all_relationships(skip=skip, limit=limit)
+    relationships = service.get_all_relationships(skip=skip, limit=limit, after_id=after_id)
     result = [schemas.RelationshipResponse.model_validate(item) for item in relationships]
     return {"success": True, "data": result}
 
@@ -583,16 +651,46 @@ def create_sro(
     result = service.create_sro(sro)
     return schemas.SROResponse.model_validate(result)
 
+@router.post("/sro/bulk", response_model=List[schemas.SROResponse])
+def create_sros_bulk(
+    sros: List[schemas.SROCreate],
+    db: Session = Depends(get_postgres_db)
+):
+    service = PostgresService(db)
+    result = service.create_sros_bulk(sros)
+    return [schemas.SROResponse.model_validate(item) for item in result]
+
+@router.post("/sro/bulk-copy", response_model=Dict[str, int])
+def bulk_copy_sros(
+    sros: List[schemas.SROCreate],
+    db: Session = Depends(get_postgres_db)
+):
+    service = PostgresService(db)
+    return {"inserted": service.bulk_copy_sros(sros)}
+
 @router.get("/sro/", response_model=List[schemas.SROResponse])
 def get_all_sros(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    after_id: Optional[int] = Query(None, description="Last id of the previous page (keyset paging)"),
     db: Session = Depends(get_postgres_db)
 ):
     service = PostgresService(db)
-    result = service.get_all_sros(skip=skip, limit=limit)
+    result = service.get_all_sros(skip=skip, limit=limit, after_id=after_id)
     return [schemas.SROResponse.model_validate(item) for item in result]
 
+@router.get("/sro/stream")
+def stream_sros(
+    diagram_id: Optional[str] = Query(None, description="Diagram ID")
+):
+    """All SROs (optionally of one diagram) as NDJSON, without loading them all in memory"""
+    def generate():
+        # Own session: it must stay open until the last row has been sent
+        with get_session() as db:
+            yield from ndjson_lines(PostgresService(db).stream_sros(diagram_id=diagram_id))
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 @router.get("/sro/{sro_id}", response_model=schemas.SROResponse)
 def get_sro(
     sro_id: int = Path(..., ge=1, description="SRO ID"),
@@ -607,10 +705,12 @@ def get_sro(
 @router.get("/sro/diagram/{diagram_id}", response_model=List[schemas.SROResponse])
 def get_sros_by_diagram(
     diagram_id: str = Path(..., description="Diagram ID"),
+    limit: int = Query(1000, ge=1, le=1000),
+    after_id: Optional[int] = Query(None, description="Last id of the previous page (keyset paging)"),
     db: Session = Depends(get_postgres_db)
 ):
     service = PostgresService(db)
-    result = service.get_sros_by_diagram(diagram_id)
+    result = service.get_sros_by_diagram(diagram_id, limit=limit, after_id=after_id)
     return [schemas.SROResponse.model_validate(item) for item in result]
 
 @router.get("/sro/subject/{subject_id}", response_model=List[schemas.SROResponse])
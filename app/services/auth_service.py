@@ -4,7 +4,6 @@ import jwt
 import bcrypt
 from uuid import UUID
 
-from sqlalchemy.orm import Session
 from app.database.postgres_conn import get_session
 from app.models.postgres_models import User
 from app.config import config
@@ -13,8 +12,9 @@ MAX_BCRYPT_PASSWORD_BYTES = 72
 
 
 class AuthService:
-    def __init__(self):
-        self.session: Session = get_session()
+    # Stateless: each call opens and closes its own Session, so one instance
+    # can be shared across threads/workers. Returned User objects are detached
+    # with their columns already loaded.
 
     def _ensure_password_length(self, password: str) -> None:
         byte_len = len(password.encode("utf-8"))
@@ -36,7 +36,8 @@ class AuthService:
             return False
 
     def get_user_by_username(self, username: str) -> Optional[User]:
-        return self.session.query(User).filter(User.username == username).first()
+        with get_session() as session:
+            return session.query(User).filter(User.username == username).first()
 
     def create_user(self, payload: Dict[str, Any]) -> User:
         user = User(
@@ -47,9 +48,10 @@ class AuthService:
             group_tags=payload.get("group", []),
             photo_url=payload.get("photoURL", ""),
         )
-        self.session.add(user)
-        self.session.commit()
-        self.session.refresh(user)
+        with get_session() as session:
+            session.add(user)
+            session.commit()
+            session.refresh(user)
         return user
 
     def authenticate(self, username: str, password: str) -> Optional[User]:
@@ -12,6 +12,7 @@ import os
 
 from app.database.mongo_conn import get_mongo_db
 from app.database.neo4j_conn import get_neo4j_session
+from app.services.neo4j_service import Neo4jService, add_search_keys
 from app.config import config
 from app.models.postgres_models import (
     RootCategory, Category, RootSubject, Subject, 
@@ -40,6 +41,11 @@ class EntityService:
         collection = self.mongo_db[collection_name]
         collection.delete_one({"_sync_id": entity_id})
     
+    def _close_neo4j_session(self, session) -> None:
+        """Close a write session; bump the graph version so Neo4jService's search cache drops stale results"""
+        session.close()
+        Neo4jService._invalidate_search_cache()
+
     def _sync_to_neo4j(self, label: str, entity_id: str, properties: Dict[str, Any]):
         """Sync entity data to Neo4j (always match by name to avoid duplicates)"""
         session = get_neo4j_session()
@@ -58,9 +64,9 @@ class EntityService:
             SET n += $props
             RETURN n
             """
-            session.run(query, name=name, props=props)
+            session.run(query, name=name, props=add_search_keys(props))
         finally:
-            session.close()
+            self._close_neo4j_session(session)
     
     def _delete_from_neo4j(self, label: str, entity_id: str, name: str = None):
         """Delete entity from Neo4j (match by name)"""
@@ -74,7 +80,7 @@ class EntityService:
                 query = f"MATCH (n:{label} {{id: $id}}) DETACH DELETE n"
                 session.run(query, id=entity_id)
         finally:
-            session.close()
+            self._close_neo4j_session(session)
 
     def _ensure_root_node(self) -> None:
         session = get_neo4j_session()
@@ -84,7 +90,7 @@ class EntityService:
                 name="AI2D_Knowledge_Graph"
             )
         finally:
-            session.close()
+            self._close_neo4j_session(session)
 
     def _link_root_category(self, root_category_name: Optional[str]) -> None:
         if not root_category_name:
@@ -102,7 +108,7 @@ class EntityService:
                 rc_name=root_category_name
             )
         finally:
-            session.close()
+            self._close_neo4j_session(session)
 
     def _link_root_subject(self, root_subject_name: Optional[str]) -> None:
         if not root_subject_name:
@@ -120,7 +126,7 @@ class EntityService:
                 rs_name=root_subject_name
             )
         finally:
-            session.close()
+            self._close_neo4j_session(session)
 
     def _link_category_to_root(self, root_category_name: Optional[str], category_name: Optional[str], clear_existing: bool = False) -> None:
         if not category_name:
@@ -149,7 +155,7 @@ class EntityService:
                 category_name=category_name
             )
         finally:
-            session.close()
+            self._close_neo4j_session(session)
 
     def _link_subject_to_root(self, root_subject_name: Optional[str], subject_name: Optional[str], clear_existing: bool = False) -> None:
         if not subject_name:
@@ -178,7 +184,7 @@ class EntityService:
                 subject_name=subject_name
             )
         finally:
-            session.close()
+            self._close_neo4j_session(session)
 
     def _normalize_string_list(self, value: Any) -> List[str]:
         if not value:
@@ -241,13 +247,16 @@ class EntityService:
                     category_name=category_name
                 )
         finally:
-            session.close()
+            self._close_neo4j_session(session)
     
     def _create_relationship_in_neo4j(self, subject_code: str, rel_name: str, object_code: str, properties: Dict = None):
         """Create relationship in Neo4j (match subjects by code or name)"""
         session = get_neo4j_session()
         try:
-            props = properties or {}
+            props = dict(properties or {})
+            # name / name_lc as relationships created by Neo4jService carry them,
+            # so the labeled triple search can match on r.name_lc
+            props.setdefault("name", rel_name)
             # Try to match by code first, fallback to id
             query = f"""
             MATCH (s:Subject)
@@ -258,9 +267,9 @@ class EntityService:
             SET r += $props
             RETURN r
             """
-            session.run(query, subject_code=str(subject_code), object_code=str(object_code), props=props)
+            session.run(query, subject_code=str(subject_code), object_code=str(object_code), props=add_search_keys(props))
         finally:
-            session.close()
+            self._close_neo4j_session(session)
 
     def _derive_diagram_trigger_code(
         self,
@@ -296,7 +305,7 @@ class EntityService:
             """
             session.run(query, diagram_id=diagram_id, props=props)
         finally:
-            session.close()
+            self._close_neo4j_session(session)
 
     def _upsert_diagram(self, diagram_id: str, data: Dict[str, Any]) -> Diagram:
         resolved_root_category_id = data.get("root_category_id")
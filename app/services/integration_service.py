@@ -499,28 +499,28 @@ class IntegrationService:
             
             result = []
             for sro in sros:
-                subject = self.postgres_service.get_subject(sro.subject_id)
-                relationship = self.postgres_service.get_relationship(sro.relationship_id)
-                obj = self.postgres_service.get_subject(sro.object_id)
+                subject = self.postgres_service.get_subject(sro["subject_id"])
+                relationship = self.postgres_service.get_relationship(sro["relationship_id"])
+                obj = self.postgres_service.get_subject(sro["object_id"])
                 
                 code = f"{subject.code}_{relationship.code}_{obj.code}"
                 
                 result.append({
-                    "id": sro.id,
+                    "id": sro["id"],
                     "code": code,
-                    "subject_id": sro.subject_id,
+                    "subject_id": sro["subject_id"],
                     "subject_name": subject.name,
                     "subject_code": subject.code,
-                    "relationship_id": sro.relationship_id,
+                    "relationship_id": sro["relationship_id"],
                     "relationship_name": relationship.name,
                     "relationship_code": relationship.code,
-                    "object_id": sro.object_id,
+                    "object_id": sro["object_id"],
                     "object_name": obj.name,
                     "object_code": obj.code,
-                    "diagram_id": sro.diagram_id,
-                    "confidence_score": float(sro.confidence_score) if sro.confidence_score else None,
-                    "context": sro.context,
-                    "created_at": sro.created_at.isoformat() if sro.created_at else None
+                    "diagram_id": sro["diagram_id"],
+                    "confidence_score": float(sro["confidence_score"]) if sro["confidence_score"] else None,
+                    "context": sro["context"],
+                    "created_at": sro["created_at"].isoformat() if sro["created_at"] else None
                 })
             
             return result
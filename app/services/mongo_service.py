@@ -1,5 +1,6 @@
 # app/services/mongo_service.py
 from app.database.mongo_conn import get_mongo_db
+from app.config import config
 from app.schemas.mongo_schemas import (
     DiagramAnnotationCreate, 
     SemanticRelationshipCreate,
@@ -8,8 +9,19 @@ from app.schemas.mongo_schemas import (
 )
 from typing import List, Dict, Any, Optional
 from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime
 
+# Named so ensure_indexes stays idempotent; readers rely on the planner picking these
+QUERY_LOGS_CREATED_AT_INDEX = "query_logs_created_at_ttl"
+ANNOTATIONS_DIAGRAM_INDEX = "annotations_diagram_processed_at"
+ANNOTATIONS_CATEGORY_INDEX = "annotations_category_processed_at"
+
+def _with_str_id(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert the ObjectId of a fetched document to str in place"""
+    doc["_id"] = str(doc["_id"])
+    return doc
+
 class MongoService:
     def __init__(self):
         self.db = get_mongo_db()
@@ -20,6 +32,26 @@ class MongoService:
         self.query_logs = self.db["query_logs"]
         self.pending_learning = self.db["pending_learning"]
         self.diagram_explanations = self.db["diagram_explanations"]
+
+    def ensure_indexes(self) -> None:
+        """Create indexes once at startup (idempotent)"""
+        # Query logs expire automatically instead of growing without bound;
+        # the same index serves the created_at sort in get_query_logs.
+        self.query_logs.create_index(
+            "created_at",
+            name=QUERY_LOGS_CREATED_AT_INDEX,
+            expireAfterSeconds=config.QUERY_LOG_TTL_DAYS * 86400
+        )
+        # Filter + sort compound indexes so reads stream in index order
+        self.diagram_annotations.create_index(
+            [("diagram_id", 1), ("processed_at", -1)],
+            name=ANNOTATIONS_DIAGRAM_INDEX
+        )
+        self.diagram_annotations.create_index(
+            [("category", 1), ("processed_at", -1)],
+            name=ANNOTATIONS_CATEGORY_INDEX
+        )
+        self.pending_learning.create_index([("status", 1), ("created_at", -1)])
     
     def create_diagram_annotation(self, annotation: DiagramAnnotationCreate) -> Dict[str, Any]:
         """Tạo annotation mới cho diagram"""
@@ -27,28 +59,37 @@ class MongoService:
         data["processed_at"] = datetime.now()
         data["metadata"] = data.get("metadata", {})
         
-        result = self.diagram_annotations.insert_one(data)
-        return self.get_diagram_annotation_by_id(str(result.inserted_id))
+        # insert_one sets data["_id"]; no need to read the document back
+        self.diagram_annotations.insert_one(data)
+        return _with_str_id(data)
     
     def get_diagram_annotation_by_id(self, annotation_id: str) -> Optional[Dict[str, Any]]:
         """Lấy annotation bằng ID"""
-        try:
-            obj_id = ObjectId(annotation_id)
-            result = self.diagram_annotations.find_one({"_id": obj_id})
-            if result:
-                result["_id"] = str(result["_id"])
-            return result
-        except:
+        if not ObjectId.is_valid(annotation_id):
             return None
+        result = self.diagram_annotations.find_one({"_id": ObjectId(annotation_id)})
+        return _with_str_id(result) if result else None
     
     def get_annotations_by_diagram(self, diagram_id: str) -> List[Dict[str, Any]]:
         """Lấy tất cả annotations của một diagram"""
-        results = self.diagram_annotations.find({"diagram_id": diagram_id})
-        annotations = []
-        for result in results:
-            result["_id"] = str(result["_id"])
-            annotations.append(result)
-        return annotations
+        results = (
+            self.diagram_annotations.find({"diagram_id": diagram_id})
+            .sort("processed_at", -1)
+        )
+        return [_with_str_id(doc) for doc in results]
+
+    def get_annotations_by_diagrams(self, diagram_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Lấy annotations của nhiều diagram trong một query, nhóm theo diagram_id"""
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        if not diagram_ids:
+            return grouped
+        results = (
+            self.diagram_annotations.find({"diagram_id": {"$in": list(set(diagram_ids))}})
+            .sort([("diagram_id", 1), ("processed_at", -1)])
+        )
+        for doc in results:
+            grouped.setdefault(doc["diagram_id"], []).append(_with_str_id(doc))
+        return grouped
     
     def create_semantic_relationship(self, relationship: SemanticRelationshipCreate) -> Dict[str, Any]:
         """Tạo semantic relationship mới"""
@@ -56,88 +97,89 @@ class MongoService:
         data["created_at"] = datetime.now()
         data["processing_model"] = data.get("processing_model", "BERT+Visual")
         
-        result = self.semantic_relationships.insert_one(data)
-        return self.get_semantic_relationship_by_id(str(result.inserted_id))
+        self.semantic_relationships.insert_one(data)
+        return _with_str_id(data)
     
     def get_semantic_relationship_by_id(self, relationship_id: str) -> Optional[Dict[str, Any]]:
         """Lấy semantic relationship bằng ID"""
-        try:
-            obj_id = ObjectId(relationship_id)
-            result = self.semantic_relationships.find_one({"_id": obj_id})
-            if result:
-                result["_id"] = str(result["_id"])
-            return result
-        except:
+        if not ObjectId.is_valid(relationship_id):
             return None
+        result = self.semantic_relationships.find_one({"_id": ObjectId(relationship_id)})
+        return _with_str_id(result) if result else None
     
     def get_relationships_by_diagram(self, diagram_id: str) -> List[Dict[str, Any]]:
         """Lấy tất cả relationships của một diagram"""
-        results = self.semantic_relationships.find({"diagram_id": diagram_id})
-        relationships = []
-        for result in results:
-            result["_id"] = str(result["_id"])
-            relationships.append(result)
-        return relationships
+        return [_with_str_id(doc) for doc in self.semantic_relationships.find({"diagram_id": diagram_id})]
     
     def search_annotations_by_category(self, category: str) -> List[Dict[str, Any]]:
         """Tìm annotations theo category"""
-        results = self.diagram_annotations.find({"category": category})
-        annotations = []
-        for result in results:
-            result["_id"] = str(result["_id"])
-            annotations.append(result)
-        return annotations
+        results = (
+            self.diagram_annotations.find({"category": category})
+            .sort("processed_at", -1)
+        )
+        return [_with_str_id(doc) for doc in results]
+    
+    def count_annotations(self) -> int:
+        """Tổng số annotations (đọc từ metadata của collection, không quét dữ liệu)"""
+        return self.diagram_annotations.estimated_document_count()
+
+    def count_annotations_by_category(self) -> List[Dict[str, Any]]:
+        """Đếm annotations theo category bằng aggregation phía server"""
+        pipeline = [
+            {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}},
+            {"$project": {"_id": 0, "category": "$_id", "count": 1}}
+        ]
+        return list(self.diagram_annotations.aggregate(pipeline))
     
     def update_annotation(self, annotation_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Cập nhật annotation"""
-        try:
-            obj_id = ObjectId(annotation_id)
-            self.diagram_annotations.update_one(
-                {"_id": obj_id},
-                {"$set": update_data}
-            )
-            return self.get_diagram_annotation_by_id(annotation_id)
-        except:
+        if not ObjectId.is_valid(annotation_id):
             return None
+        result = self.diagram_annotations.find_one_and_update(
+            {"_id": ObjectId(annotation_id)},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
+        )
+        return _with_str_id(result) if result else None
     
     def delete_annotation(self, annotation_id: str) -> bool:
         """Xóa annotation"""
-        try:
-            obj_id = ObjectId(annotation_id)
-            result = self.diagram_annotations.delete_one({"_id": obj_id})
-            return result.deleted_count > 0
-        except:
+        if not ObjectId.is_valid(annotation_id):
             return False
+        return self.diagram_annotations.delete_one({"_id": ObjectId(annotation_id)}).deleted_count > 0
 
     # ========== ROOT SUBJECTS ==========
     def create_root_subject(self, root_subject: RootSubjectDocCreate) -> Dict[str, Any]:
         data = root_subject.model_dump()
         data["created_at"] = datetime.now()
-        result = self.root_subjects.insert_one(data)
-        return self.get_root_subject_by_id(str(result.inserted_id))
+        self.root_subjects.insert_one(data)
+        return _with_str_id(data)
 
     def get_root_subject_by_id(self, doc_id: str) -> Optional[Dict[str, Any]]:
-        try:
-            obj_id = ObjectId(doc_id)
-            result = self.root_subjects.find_one({"_id": obj_id})
-            if result:
-                result["_id"] = str(result["_id"])
-            return result
-        except:
+        if not ObjectId.is_valid(doc_id):
             return None
+        result = self.root_subjects.find_one({"_id": ObjectId(doc_id)})
+        return _with_str_id(result) if result else None
 
     def get_root_subject_by_root_id(self, root_subject_id: int) -> Optional[Dict[str, Any]]:
         result = self.root_subjects.find_one({"root_subject_id": root_subject_id})
-        if result:
-            result["_id"] = str(result["_id"])
-        return result
+        return _with_str_id(result) if result else None
+
+    def get_root_subjects_by_ids(self, root_subject_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Lấy nhiều root subject trong một query, trả về dict root_subject_id -> doc"""
+        if not root_subject_ids:
+            return {}
+        results = self.root_subjects.find({"root_subject_id": {"$in": list(set(root_subject_ids))}})
+        return {doc["root_subject_id"]: _with_str_id(doc) for doc in results}
 
     def update_root_subject(self, root_subject_id: int, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        self.root_subjects.update_one(
+        result = self.root_subjects.find_one_and_update(
             {"root_subject_id": root_subject_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
-        return self.get_root_subject_by_root_id(root_subject_id)
+        return _with_str_id(result) if result else None
 
     def delete_root_subject(self, root_subject_id: int) -> bool:
         result = self.root_subjects.delete_one({"root_subject_id": root_subject_id})
@@ -147,31 +189,33 @@ class MongoService:
     def create_subject(self, subject: SubjectDocCreate) -> Dict[str, Any]:
         data = subject.model_dump()
         data["created_at"] = datetime.now()
-        result = self.subjects.insert_one(data)
-        return self.get_subject_by_id(str(result.inserted_id))
+        self.subjects.insert_one(data)
+        return _with_str_id(data)
 
     def get_subject_by_id(self, doc_id: str) -> Optional[Dict[str, Any]]:
-        try:
-            obj_id = ObjectId(doc_id)
-            result = self.subjects.find_one({"_id": obj_id})
-            if result:
-                result["_id"] = str(result["_id"])
-            return result
-        except:
+        if not ObjectId.is_valid(doc_id):
             return None
+        result = self.subjects.find_one({"_id": ObjectId(doc_id)})
+        return _with_str_id(result) if result else None
 
     def get_subject_by_subject_id(self, subject_id: int) -> Optional[Dict[str, Any]]:
         result = self.subjects.find_one({"subject_id": subject_id})
-        if result:
-            result["_id"] = str(result["_id"])
-        return result
+        return _with_str_id(result) if result else None
+
+    def get_subjects_by_ids(self, subject_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Lấy nhiều subject trong một query, trả về dict subject_id -> doc"""
+        if not subject_ids:
+            return {}
+        results = self.subjects.find({"subject_id": {"$in": list(set(subject_ids))}})
+        return {doc["subject_id"]: _with_str_id(doc) for doc in results}
 
     def update_subject(self, subject_id: int, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        self.subjects.update_one(
+        result = self.subjects.find_one_and_update(
             {"subject_id": subject_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
-        return self.get_subject_by_subject_id(subject_id)
+        return _with_str_id(result) if result else None
 
     def delete_subject(self, subject_id: int) -> bool:
         result = self.subjects.delete_one({"subject_id": subject_id})
@@ -181,65 +225,55 @@ class MongoService:
     def create_query_log(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         data = dict(payload)
         data["created_at"] = datetime.now()
-        result = self.query_logs.insert_one(data)
-        return self.get_query_log_by_id(str(result.inserted_id))
+        self.query_logs.insert_one(data)
+        return _with_str_id(data)
 
     def get_query_log_by_id(self, log_id: str) -> Optional[Dict[str, Any]]:
-        try:
-            obj_id = ObjectId(log_id)
-            result = self.query_logs.find_one({"_id": obj_id})
-            if result:
-                result["_id"] = str(result["_id"])
-            return result
-        except Exception:
+        if not ObjectId.is_valid(log_id):
             return None
+        result = self.query_logs.find_one({"_id": ObjectId(log_id)})
+        return _with_str_id(result) if result else None
 
     def get_query_logs(self, limit: int = 50) -> List[Dict[str, Any]]:
-        results = self.query_logs.find().sort("created_at", -1).limit(limit)
-        logs: List[Dict[str, Any]] = []
-        for result in results:
-            result["_id"] = str(result["_id"])
-            logs.append(result)
-        return logs
+        results = (
+            self.query_logs.find()
+            .sort("created_at", -1)
+            .limit(limit)
+        )
+        return [_with_str_id(doc) for doc in results]
 
     # ========== PENDING LEARNING ITEMS ==========
     def create_pending_learning_item(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         data = dict(payload)
         data["status"] = data.get("status", "pending")
         data["created_at"] = datetime.now()
-        result = self.pending_learning.insert_one(data)
-        return self.get_pending_learning_item_by_id(str(result.inserted_id))
+        self.pending_learning.insert_one(data)
+        return _with_str_id(data)
 
     def get_pending_learning_item_by_id(self, item_id: str) -> Optional[Dict[str, Any]]:
-        try:
-            obj_id = ObjectId(item_id)
-            result = self.pending_learning.find_one({"_id": obj_id})
-            if result:
-                result["_id"] = str(result["_id"])
-            return result
-        except Exception:
+        if not ObjectId.is_valid(item_id):
             return None
+        result = self.pending_learning.find_one({"_id": ObjectId(item_id)})
+        return _with_str_id(result) if result else None
 
     def get_pending_learning_items(self, limit: int = 100, status: Optional[str] = None) -> List[Dict[str, Any]]:
         query: Dict[str, Any] = {}
         if status:
             query["status"] = status
         results = self.pending_learning.find(query).sort("created_at", -1).limit(limit)
-        items: List[Dict[str, Any]] = []
-        for result in results:
-            result["_id"] = str(result["_id"])
-            items.append(result)
-        return items
+        return [_with_str_id(doc) for doc in results]
 
     def update_pending_learning_item(self, item_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        try:
-            obj_id = ObjectId(item_id)
-            payload = dict(update_data)
-            payload["updated_at"] = datetime.now()
-            self.pending_learning.update_one({"_id": obj_id}, {"$set": payload})
-            return self.get_pending_learning_item_by_id(item_id)
-        except Exception:
+        if not ObjectId.is_valid(item_id):
             return None
+        payload = dict(update_data)
+        payload["updated_at"] = datetime.now()
+        result = self.pending_learning.find_one_and_update(
+            {"_id": ObjectId(item_id)},
+            {"$set": payload},
+            return_document=ReturnDocument.AFTER
+        )
+        return _with_str_id(result) if result else None
 
     # ========== DIAGRAM EXPLANATION CACHE ==========
     def get_diagram_explanation(
@@ -255,19 +289,16 @@ class MongoService:
         if topic_key:
             query["topic_key"] = topic_key
 
-        result = self.diagram_explanations.find_one(query)
-        if not result:
-            return None
-
-        result["_id"] = str(result["_id"])
-        self.diagram_explanations.update_one(
-            {"_id": ObjectId(result["_id"])},
+        # Lookup and usage bookkeeping in one round trip; returns the document
+        # as it was before the update, same as the former find + update.
+        result = self.diagram_explanations.find_one_and_update(
+            query,
             {
                 "$set": {"last_used_at": datetime.now()},
                 "$inc": {"usage_count": 1},
             },
         )
-        return result
+        return _with_str_id(result) if result else None
 
     def upsert_diagram_explanation(
         self,
@@ -304,6 +335,4 @@ class MongoService:
         )
 
         result = self.diagram_explanations.find_one(filter_query)
-        if result:
-            result["_id"] = str(result["_id"])
-        return result or {}
\ No newline at end of file
+        return _with_str_id(result) if result else {}
\ No newline at end of file
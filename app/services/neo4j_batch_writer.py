@@ -0,0 +1,128 @@
+# app/services/neo4j_batch_writer.py
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.config import config
+from app.database.neo4j_conn import create_neo4j_async_driver
+from app.schemas.neo4j_schemas import NodeCreate
+from app.services.neo4j_service import Neo4jService, node_properties
+
+logger = logging.getLogger(__name__)
+
+# One homogeneous UNWIND per label set; MERGE on id keeps retried batches idempotent
+MERGE_NODES_BATCH_TEMPLATE = """
+UNWIND $rows AS row
+MERGE (n:{labels} {{id: row.id}})
+ON CREATE SET n.created_at = datetime()
+SET n += row.props
+RETURN n
+"""
+
+_STOP = object()
+
+class Neo4jBatchWriter:
+    """Coalesce node writes from many requests into batched UNWIND transactions.
+
+    Handlers await submit(); a single background task drains the queue, flushing
+    after max_batch_size operations or max_delay seconds, whichever comes first.
+    """
+
+    def __init__(self, max_batch_size: int = 500, max_delay: float = 0.05):
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._driver = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._driver = create_neo4j_async_driver()
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush what is already queued, then close the async driver"""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        await self._driver.close()
+        self._task = None
+        self._queue = None
+        self._driver = None
+
+    async def submit(self, node_data: NodeCreate) -> Dict[str, Any]:
+        """Queue a node MERGE and wait until the batch containing it has committed"""
+        if self._task is None:
+            raise RuntimeError("Neo4j batch writer is not running")
+
+        labels = Neo4jService._format_labels(node_data.labels or ["STEM_NODE"])
+        properties = node_properties(node_data)
+        if properties.get("id") is None:
+            raise ValueError("Batched writes require a node id")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((labels, {"id": properties["id"], "props": properties}, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[str, Dict[str, Any], asyncio.Future]]) -> None:
+        bins: Dict[str, List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        for labels, row, future in batch:
+            bins.setdefault(labels, []).append((row, future))
+
+        try:
+            async with self._driver.session() as session:
+                results = await session.execute_write(self._merge_bins, bins)
+        except Exception as e:
+            logger.error(f"Neo4j batch write of {len(batch)} nodes failed: {e}")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        Neo4jService._invalidate_search_cache()
+        for labels, entries in bins.items():
+            for (_, future), node in zip(entries, results[labels]):
+                if not future.done():
+                    future.set_result(node)
+
+    @staticmethod
+    async def _merge_bins(tx, bins) -> Dict[str, List[Dict[str, Any]]]:
+        results = {}
+        for labels, entries in bins.items():
+            query = MERGE_NODES_BATCH_TEMPLATE.format(labels=labels)
+            result = await tx.run(query, rows=[row for row, _ in entries])
+            results[labels] = [dict(record["n"]) async for record in result]
+        return results
+
+neo4j_batch_writer = Neo4jBatchWriter(
+    max_batch_size=config.NEO4J_WRITE_BATCH_SIZE,
+    max_delay=config.NEO4J_WRITE_BATCH_DELAY_MS / 1000
+)
@@ -1,70 +1,682 @@
 # app/services/neo4j_service.py
-from app.database.neo4j_conn import get_neo4j_session
+from app.database.neo4j_conn import get_neo4j_driver
+from neo4j.exceptions import Neo4jError
 from app.schemas.neo4j_schemas import NodeCreate, RelationshipCreate, NodeSelector
 from typing import List, Dict, Any, Optional
 import re
 import logging
+import threading
 from datetime import datetime
+from functools import lru_cache, wraps
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Schema statements applied once at startup by Neo4jService.ensure_indexes()
+_SCHEMA_STATEMENTS = [
+    "CREATE FULLTEXT INDEX stem_node_name IF NOT EXISTS FOR (n:STEM_NODE) ON EACH [n.name]",
+    "CREATE FULLTEXT INDEX rel_name IF NOT EXISTS FOR ()-[r:RELATES]-() ON EACH [r.name]",
+    "CREATE FULLTEXT INDEX subject_search IF NOT EXISTS FOR (s:Subject) ON EACH [s.name, s.synonyms]",
+    # Text indexes serve CONTAINS on the pre-lowered name
+    "CREATE TEXT INDEX stem_node_name_lc IF NOT EXISTS FOR (n:STEM_NODE) ON (n.name_lc)",
+    "CREATE TEXT INDEX subject_name_lc IF NOT EXISTS FOR (n:Subject) ON (n.name_lc)",
+]
+
+# Fill name_lc on data written before it was maintained.
+# Full graph scan: run once via scripts/backfill_neo4j_search_keys.py, not at startup
+_SEARCH_KEY_BACKFILL_STATEMENTS = [
+    """
+    MATCH (n) WHERE n.name IS NOT NULL AND n.name_lc IS NULL
+    CALL { WITH n SET n.name_lc = toLower(toString(n.name)) } IN TRANSACTIONS OF 10000 ROWS
+    """,
+    """
+    MATCH ()-[r]->() WHERE r.name IS NOT NULL AND r.name_lc IS NULL
+    CALL { WITH r SET r.name_lc = toLower(toString(r.name)) } IN TRANSACTIONS OF 10000 ROWS
+    """,
+]
+
+# (label, property, unique) lookups used by MATCH (n:Label {prop: $value}).
+# Unique ones become constraints; if existing data has duplicates the
+# constraint cannot be created and a plain {name}_lookup index is used instead,
+# which is dropped again once the constraint can be created.
+_LOOKUP_INDEXES = [
+    ("STEM_NODE", "id", True),
+    ("Root", "name", True),
+    ("RootSubject", "id", True),
+    ("Subject", "id", True),
+    ("Diagram", "id", True),
+    ("RootCategory", "id", True),
+    ("Category", "name", False),
+    ("Subject", "name", False),
+]
+
+_LUCENE_SPECIAL_CHARS = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+def add_search_keys(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of properties with the pre-lowered name_lc used by CONTAINS searches"""
+    result = dict(properties)
+    if isinstance(result.get("name"), str):
+        result["name_lc"] = result["name"].lower()
+    return result
+
+def node_properties(node_data: NodeCreate) -> Dict[str, Any]:
+    """Flat property map for a labeled node: properties plus any legacy fields, with search keys"""
+    properties = dict(node_data.properties or {})
+
+    # Merge legacy fields if provided
+    if node_data.id is not None and "id" not in properties:
+        properties["id"] = node_data.id
+    if node_data.name is not None and "name" not in properties:
+        properties["name"] = node_data.name
+    if node_data.type is not None and "type" not in properties:
+        properties["type"] = node_data.type
+    if node_data.category is not None and "category" not in properties:
+        properties["category"] = node_data.category
+    return add_search_keys(properties)
+
+def _fulltext_query(text: str) -> Optional[str]:
+    """Build a Lucene query from user input (all terms required, fuzzy for longer terms); None if nothing to search"""
+    terms = []
+    for token in (text or "").lower().split():
+        escaped = _LUCENE_SPECIAL_CHARS.sub(r"\\\1", token)
+        terms.append(f"{escaped}~" if len(token) > 3 else escaped)
+    if not terms:
+        return None
+    return " AND ".join(terms)
+
+# Static Cypher text lives at module level so every call sends the identical
+# string and hits the server's query plan cache. Queries that splice in
+# validated labels/relationship types are still built per call.
+CREATE_NODE_CYPHER = """
+CREATE (n:STEM_NODE {
+    id: $id,
+    name: $name,
+    name_lc: toLower($name),
+    type: $type,
+    category: $category,
+    properties: $properties,
+    created_at: datetime()
+})
+RETURN n
+"""
+
+CREATE_REL_CYPHER = """
+MATCH (a:STEM_NODE {id: $from_node_id})
+MATCH (b:STEM_NODE {id: $to_node_id})
+CREATE (a)-[r:RELATES {
+    type: $relationship_type,
+    name: $name,
+    name_lc: toLower($name),
+    confidence: $confidence,
+    properties: $properties,
+    created_at: datetime()
+}]->(b)
+RETURN a, r, b
+"""
+
+CREATE_NODES_BULK_CYPHER = """
+UNWIND $rows AS row
+CREATE (n:STEM_NODE {
+    id: row.id,
+    name: row.name,
+    name_lc: toLower(row.name),
+    type: row.type,
+    category: row.category,
+    properties: row.properties,
+    created_at: datetime()
+})
+RETURN n
+"""
+
+CREATE_RELS_BULK_CYPHER = """
+UNWIND $rows AS row
+MATCH (a:STEM_NODE {id: row.from_node_id})
+MATCH (b:STEM_NODE {id: row.to_node_id})
+CREATE (a)-[r:RELATES {
+    type: row.relationship_type,
+    name: row.name,
+    name_lc: toLower(row.name),
+    confidence: row.confidence,
+    properties: row.properties,
+    created_at: datetime()
+}]->(b)
+RETURN a.id AS from_node_id, r, b.id AS to_node_id
+"""
+
+# Relationship types and selector labels/keys cannot be parameters, so the
+# selector form of the bulk create is formatted once per distinct group.
+_CREATE_RELS_BY_SELECTOR_TEMPLATE = """
+UNWIND $rows AS row
+MATCH (a:{from_label} {{{from_key}: row.a}})
+MATCH (b:{to_label} {{{to_key}: row.b}})
+CREATE (a)-[r:{rel_type}]->(b)
+SET r += row.props, r.created_at = datetime()
+RETURN row.a AS from_node_id, r, row.b AS to_node_id
+"""
+
+_SEARCH_TRIPLE_RETURN = """
+RETURN 
+    s.id as subject_id, 
+    s.name as subject_name,
+    r.name as relationship,
+    o.id as object_id,
+    o.name as object_name,
+    s.category as category,
+    r.confidence as confidence,
+    coalesce(s.diagram_id, s.diagramId, r.diagram_id, r.diagramId, '') as diagram_id
+ORDER BY r.confidence DESC
+LIMIT 10
+"""
+
+# Labeled search compares against the pre-lowered name_lc written with every name
+SEARCH_TRIPLE_BY_LABEL_TEMPLATE = """
+MATCH (s:{subject_label})-[r:{rel_type}]->(o:{object_label})
+WHERE s.name_lc CONTAINS $subject_lc
+AND o.name_lc CONTAINS $object_lc
+AND (
+    r.name_lc CONTAINS $relationship_lc
+    OR toLower(type(r)) CONTAINS $relationship_lc
+)
+RETURN 
+    s.id as subject_id, 
+    s.name as subject_name,
+    coalesce(r.name, type(r)) as relationship,
+    o.id as object_id,
+    o.name as object_name,
+    s.category as category,
+    r.confidence as confidence,
+    coalesce(s.diagram_id, s.diagramId, r.diagram_id, r.diagramId, '') as diagram_id
+ORDER BY r.confidence DESC
+LIMIT 10
+"""
+
+_SEARCH_TRIPLE_RELATIONSHIP_HITS = """
+CALL db.index.fulltext.queryRelationships('rel_name', $relationship_query) YIELD relationship
+WITH collect(relationship) AS rels
+"""
+
+_SEARCH_TRIPLE_SUBJECT_HITS = """
+CALL db.index.fulltext.queryNodes('stem_node_name', $subject_query) YIELD node AS s
+"""
+
+_SEARCH_TRIPLE_OBJECT_HITS = """
+CALL db.index.fulltext.queryNodes('stem_node_name', $object_query) YIELD node AS o
+"""
+
+_SEARCH_TRIPLE_MATCH = """
+MATCH (s:STEM_NODE)-[r:RELATES]->(o:STEM_NODE)
+"""
+
+GET_NODE_CYPHER = "MATCH (n:STEM_NODE {id: $node_id}) RETURN n"
+
+GET_NODES_BY_IDS_CYPHER = """
+UNWIND $node_ids AS node_id
+MATCH (n:STEM_NODE {id: node_id})
+RETURN node_id, n
+"""
+
+UPDATE_NODE_CYPHER = """
+MATCH (n:STEM_NODE {id: $node_id})
+SET n += $properties
+RETURN n
+"""
+
+DELETE_NODE_CYPHER = """
+MATCH (n:STEM_NODE {id: $node_id})
+DETACH DELETE n
+RETURN COUNT(n) as deleted_count
+"""
+
+# Selector-keyed node queries; label/key are validated identifiers
+GET_NODE_BY_KEY_TEMPLATE = "MATCH (n:{label} {{{key}: $value}}) RETURN n"
+
+UPDATE_NODE_BY_KEY_TEMPLATE = """
+MATCH (n:{label} {{{key}: $value}})
+SET n += $properties
+RETURN n
+"""
+
+DELETE_NODE_BY_KEY_TEMPLATE = """
+MATCH (n:{label} {{{key}: $value}})
+DETACH DELETE n
+RETURN COUNT(n) as deleted_count
+"""
+
+# Many key values in one round trip; {label} / {key} are validated identifiers
+GET_NODES_BY_KEYS_TEMPLATE = """
+UNWIND $values AS value
+MATCH (n:{label} {{{key}: value}})
+RETURN value, n
+"""
+
+# Keyset pagination on the indexed id; {cursor_clause} is "n.id > $cursor" or "n.id IS NOT NULL"
+GET_NODES_PAGE_TEMPLATE = """
+MATCH (n:{label})
+WHERE {cursor_clause}
+RETURN n
+ORDER BY n.id
+LIMIT $limit
+"""
+
+GET_ALL_NODES_TEMPLATE = """
+MATCH (n{label_clause})
+RETURN {projection} AS n
+LIMIT $limit
+"""
+
+MERGE_ROOT_CYPHER = "MERGE (root:Root {name: 'AI2D_Knowledge_Graph'}) RETURN root"
+
+MERGE_ROOT_SUBJECT_CYPHER = """
+MERGE (rs:RootSubject {id: $id})
+SET rs.name = $name,
+    rs.name_lc = toLower($name),
+    rs.description = $description,
+    rs.parent_id = $parent_id,
+    rs.level = $level,
+    rs.created_at = datetime()
+RETURN rs
+"""
+
+LINK_ROOT_TO_ROOT_SUBJECT_CYPHER = """
+MATCH (root:Root {name: 'AI2D_Knowledge_Graph'})
+MATCH (rs:RootSubject {id: $id})
+MERGE (root)-[:HAS_ROOT_SUBJECT]->(rs)
+"""
+
+LINK_PARENT_ROOT_SUBJECT_CYPHER = """
+MATCH (parent:RootSubject {id: $parent_id})
+MATCH (child:RootSubject {id: $id})
+MERGE (parent)-[:HAS_CHILD_ROOT_SUBJECT]->(child)
+"""
+
+GET_PARENT_ROOT_SUBJECT_IDS_CYPHER = """
+MATCH (p:RootSubject)-[:HAS_CHILD_ROOT_SUBJECT]->(rs:RootSubject {id: $id})
+RETURN collect(p.id) AS parent_ids
+"""
+
+UNLINK_PARENT_ROOT_SUBJECT_CYPHER = """
+MATCH (:RootSubject)-[r:HAS_CHILD_ROOT_SUBJECT]->(:RootSubject {id: $id})
+DELETE r
+"""
+
+GET_ROOT_SUBJECT_CYPHER = "MATCH (rs:RootSubject {id: $id}) RETURN rs"
+
+UPDATE_ROOT_SUBJECT_CYPHER = """
+MATCH (rs:RootSubject {id: $id})
+SET rs += $properties
+RETURN rs
+"""
+
+DELETE_ROOT_SUBJECT_CYPHER = """
+MATCH (rs:RootSubject {id: $id})
+DETACH DELETE rs
+RETURN COUNT(rs) as deleted_count
+"""
+
+MERGE_SUBJECT_CYPHER = """
+MERGE (s:Subject {id: $id})
+SET s.name = $name,
+    s.name_lc = toLower($name),
+    s.root_subject_id = $root_subject_id,
+    s.synonyms = $synonyms,
+    s.description = $description,
+    s.created_at = datetime()
+RETURN s
+"""
+
+LINK_SUBJECT_TO_ROOT_SUBJECT_CYPHER = """
+MATCH (rs:RootSubject {id: $root_subject_id})
+MATCH (s:Subject {id: $id})
+MERGE (rs)-[:HAS_SUBJECT]->(s)
+"""
+
+GET_SUBJECT_ROOT_SUBJECT_IDS_CYPHER = """
+MATCH (rs:RootSubject)-[:HAS_SUBJECT]->(s:Subject {id: $id})
+RETURN collect(rs.id) AS root_subject_ids
+"""
+
+UNLINK_SUBJECT_FROM_ROOT_SUBJECT_CYPHER = """
+MATCH (:RootSubject)-[r:HAS_SUBJECT]->(:Subject {id: $id})
+DELETE r
+"""
+
+# One statement for all categories; callers pass de-duplicated names
+LINK_SUBJECT_TO_CATEGORIES_CYPHER = """
+MATCH (s:Subject {id: $id})
+UNWIND $category_names AS category_name
+MATCH (c:Category {name: category_name})
+MERGE (s)-[:BELONGS_TO_CATEGORY]->(c)
+"""
+
+GET_SUBJECT_CYPHER = "MATCH (s:Subject {id: $id}) RETURN s"
+
+UPDATE_SUBJECT_CYPHER = """
+MATCH (s:Subject {id: $id})
+SET s += $properties
+RETURN s
+"""
+
+DELETE_SUBJECT_CYPHER = """
+MATCH (s:Subject {id: $id})
+DETACH DELETE s
+RETURN COUNT(s) as deleted_count
+"""
+
+# $subject_queries are Lucene queries built by _fulltext_query from the lowered names
+INFER_CATEGORIES_CYPHER = """
+UNWIND $subject_queries AS subject_query
+CALL db.index.fulltext.queryNodes('subject_search', subject_query) YIELD node AS s
+MATCH (s)-[:BELONGS_TO_CATEGORY]->(c:Category)
+RETURN c.name as category_name, count(DISTINCT s) as subject_count
+ORDER BY subject_count DESC
+"""
+
+# Top inferred category and its diagrams in one round-trip; $subject_names are lowered by the caller
+FIND_DIAGRAMS_BY_SUBJECT_INFERENCE_CYPHER = """
+UNWIND $subject_queries AS subject_query
+CALL db.index.fulltext.queryNodes('subject_search', subject_query) YIELD node AS s
+MATCH (s)-[:BELONGS_TO_CATEGORY]->(c:Category)
+WITH c, count(DISTINCT s) AS subject_count
+ORDER BY subject_count DESC
+LIMIT 1
+MATCH (c)-[:CONTAINS]->(d:Diagram)
+OPTIONAL MATCH (d)-[:HAS_TEXT_LABEL]->(tl:TextLabel)
+WHERE any(subject_name IN $subject_names 
+          WHERE toLower(tl.value) CONTAINS subject_name
+             OR toLower(tl.replacement_text) CONTAINS subject_name)
+RETURN c.name as inferred_category,
+       d.id as diagram_id, 
+       d.category as category, 
+       count(tl) as matching_labels,
+       collect(DISTINCT tl.value) as matched_text
+ORDER BY matching_labels DESC
+LIMIT 10
+"""
+
+_TEXT_LABEL_MATCH = """
+MATCH (tl)
+WHERE (
+    any(lbl IN labels(tl) WHERE toLower(lbl) = 'textlabel')
+    OR toLower(coalesce(tl.type, '')) IN ['text_label', 'textlabel']
+)
+"""
+
+# Text labels whose diagram id (with or without image extension) is one of $keys
+TEXT_LABELS_BY_DIAGRAM_KEYS_CYPHER = """
+UNWIND $keys AS lookup_key
+""" + _TEXT_LABEL_MATCH + """
+  AND (
+    toLower(coalesce(tl.diagram_id, tl.diagramId, tl.image_id, tl.imageId, '')) = lookup_key
+    OR replace(toLower(coalesce(tl.diagram_id, tl.diagramId, tl.image_id, tl.imageId, '')), '.png', '') = lookup_key
+    OR replace(toLower(coalesce(tl.diagram_id, tl.diagramId, tl.image_id, tl.imageId, '')), '.jpg', '') = lookup_key
+    OR replace(toLower(coalesce(tl.diagram_id, tl.diagramId, tl.image_id, tl.imageId, '')), '.jpeg', '') = lookup_key
+  )
+RETURN coalesce(tl.diagram_id, tl.diagramId, tl.image_id, tl.imageId, '') AS diagram_id,
+       coalesce(tl.value, tl.text, tl.label, tl.name, '') AS value,
+       coalesce(tl.replacement_text, tl.replacementText, '') AS replacement_text,
+       coalesce(tl.category, tl.category_name, tl.categoryName, '') AS category
+"""
+
+# (diagram_id, lowered text) for every text label
+TEXT_LABEL_BLOBS_CYPHER = _TEXT_LABEL_MATCH + """
+WITH tl,
+     toLower(trim(coalesce(tl.diagram_id, tl.diagramId, tl.image_id, tl.imageId, ''))) AS diagram_id,
+     toLower(trim(
+        coalesce(tl.value, '') + ' ' +
+        coalesce(tl.replacement_text, '') + ' ' +
+        coalesce(tl.text, '') + ' ' +
+        coalesce(tl.label, '') + ' ' +
+        coalesce(tl.name, '')
+     )) AS text_blob
+WHERE diagram_id <> '' AND text_blob <> ''
+RETURN diagram_id, text_blob
+"""
+
+_RICH_GRAPH_PATHS = """
+MATCH (d:Diagram {id: $diagram_id})
+OPTIONAL MATCH (c:Category)-[:CONTAINS]->(d)
+OPTIONAL MATCH (rc:RootCategory)-[:HAS_CATEGORY]->(c)
+OPTIONAL MATCH (root:Root)-[:HAS_ROOT_CATEGORY]->(rc)
+WHERE ($root_category_id IS NULL OR rc.id = $root_category_id)
+  AND ($category_name IS NULL OR c.name = $category_name)
+WITH d, c, rc, root
+OPTIONAL MATCH p1=(root)-[:HAS_ROOT_CATEGORY]->(rc)-[:HAS_CATEGORY]->(c)-[:CONTAINS]->(d)
+OPTIONAL MATCH p2=(d)-[*1..2]-(detail)
+WHERE any(lbl IN labels(detail) WHERE lbl IN ['TextLabel', 'Blob', 'Arrow', 'ArrowHead', 'ImageConst'])
+WITH [p1, p2] AS paths
+UNWIND paths AS p
+WITH p WHERE p IS NOT NULL
+"""
+
+RICH_GRAPH_NODES_CYPHER = _RICH_GRAPH_PATHS + """
+UNWIND nodes(p) AS n
+RETURN DISTINCT elementId(n) AS node_id, labels(n) AS node_labels, properties(n) AS node_props
+"""
+
+RICH_GRAPH_EDGES_CYPHER = _RICH_GRAPH_PATHS + """
+UNWIND relationships(p) AS r
+RETURN DISTINCT
+    elementId(r) AS edge_id,
+    elementId(startNode(r)) AS from_id,
+    elementId(endNode(r)) AS to_id,
+    type(r) AS rel_type,
+    properties(r) AS rel_props
+"""
+
+@lru_cache(maxsize=512)
+def _render_cypher(template: str, **identifiers: str) -> str:
+    """Format a Cypher template once per distinct identifier set, reusing the same string"""
+    return template.format(**identifiers)
+
+@lru_cache(maxsize=8)
+def _search_triple_cypher(by_subject: bool, by_relationship: bool, by_object: bool) -> str:
+    """Triple search over the fulltext indexes; an empty term matches everything, as before"""
+    query = _SEARCH_TRIPLE_RELATIONSHIP_HITS if by_relationship else ""
+    if by_subject:
+        query += _SEARCH_TRIPLE_SUBJECT_HITS
+    if by_object:
+        query += _SEARCH_TRIPLE_OBJECT_HITS
+    query += _SEARCH_TRIPLE_MATCH
+    if by_relationship:
+        query += "WHERE r IN rels\n"
+    return query + _SEARCH_TRIPLE_RETURN
+
+def _serialize_neo4j_value(value: Any) -> Any:
+    """Return a JSON-serializable value, or the same object if nothing needs converting"""
+    # Handle neo4j.time.DateTime (has iso_format) and datetime objects
+    if hasattr(value, 'iso_format'):
+        return value.iso_format()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return _serialize_neo4j_dict(value)
+    if isinstance(value, list):
+        converted = None
+        for index, item in enumerate(value):
+            new_item = _serialize_neo4j_value(item)
+            if new_item is not item:
+                if converted is None:
+                    converted = list(value)
+                converted[index] = new_item
+        return value if converted is None else converted
+    return value
+
 def _serialize_neo4j_dict(node_dict: Dict[str, Any]) -> Dict[str, Any]:
     """Convert Neo4j types (like neo4j.time.DateTime) to JSON-serializable types"""
+    # Copy-on-write: unchanged input is returned as is, and only containers
+    # holding a converted value are copied.
     if not isinstance(node_dict, dict):
         return node_dict
-    
-    result = {}
+
+    result = None
     for key, value in node_dict.items():
-        # Handle neo4j.time.DateTime
-        if hasattr(value, 'iso_format'):  # neo4j.time.DateTime has iso_format method
-            result[key] = value.iso_format()
-        # Handle datetime objects
-        elif isinstance(value, datetime):
-            result[key] = value.isoformat()
-        # Handle lists
-        elif isinstance(value, list):
-            result[key] = [_serialize_neo4j_dict(v) if isinstance(v, dict) else v for v in value]
-        # Handle dicts
-        elif isinstance(value, dict):
-            result[key] = _serialize_neo4j_dict(value)
-        else:
-            result[key] = value
-    
-    return result
+        new_value = _serialize_neo4j_value(value)
+        if new_value is not value:
+            if result is None:
+                result = dict(node_dict)
+            result[key] = new_value
+
+    return node_dict if result is None else result
+
+def _invalidates_search_cache(method):
+    """Invalidate cached search results after a method that writes to the graph"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._invalidate_search_cache()
+    return wrapper
 
 class Neo4jService:
+    # Process-wide cache for read-only search results. Keys include the graph
+    # version, which every write bumps, so entries computed before a write are
+    # never served again and simply age out of the TTL cache.
+    _search_cache: TTLCache = TTLCache(maxsize=4096, ttl=300)
+    _search_cache_lock = threading.RLock()
+    _graph_version = 0
+    _cache_hits = 0
+    _cache_misses = 0
+
     def __init__(self):
-        self.session = get_neo4j_session()
+        # The driver owns the connection pool; sessions are opened per call
+        self.driver = get_neo4j_driver()
+
+    @staticmethod
+    def _fetch_all(tx, query: str, params: Dict[str, Any]) -> List[Any]:
+        return list(tx.run(query, params))
+
+    def _tx_read(self, fn, *args) -> Any:
+        """Run fn(tx, *args) in one managed read transaction (routed to readers, retried)"""
+        with self.driver.session() as session:
+            return session.execute_read(fn, *args)
+
+    def _tx_write(self, fn, *args) -> Any:
+        """Run fn(tx, *args) in one managed write transaction (routed to the leader, retried)"""
+        with self.driver.session() as session:
+            return session.execute_write(fn, *args)
+
+    def _read(self, query: str, **params) -> List[Any]:
+        return self._tx_read(self._fetch_all, query, params)
+
+    def _write(self, query: str, **params) -> List[Any]:
+        return self._tx_write(self._fetch_all, query, params)
+
+    def _read_single(self, query: str, **params) -> Optional[Any]:
+        records = self._read(query, **params)
+        return records[0] if records else None
+
+    def _write_single(self, query: str, **params) -> Optional[Any]:
+        records = self._write(query, **params)
+        return records[0] if records else None
+
+    @classmethod
+    def _invalidate_search_cache(cls) -> None:
+        with cls._search_cache_lock:
+            cls._graph_version += 1
+
+    @classmethod
+    def _search_cache_key(cls, *parts: Any) -> tuple:
+        with cls._search_cache_lock:
+            return (cls._graph_version,) + parts
+
+    @classmethod
+    def _search_cache_get(cls, key: tuple) -> Optional[List[Dict[str, Any]]]:
+        with cls._search_cache_lock:
+            cached = cls._search_cache.get(key)
+            if cached is None:
+                cls._cache_misses += 1
+                return None
+            cls._cache_hits += 1
+        return [dict(row) for row in cached]
+
+    @classmethod
+    def _search_cache_put(cls, key: tuple, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with cls._search_cache_lock:
+            cls._search_cache[key] = rows
+        return [dict(row) for row in rows]
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, Any]:
+        """Hit/miss counters and size of the search result cache"""
+        with cls._search_cache_lock:
+            return {
+                "hits": cls._cache_hits,
+                "misses": cls._cache_misses,
+                "size": len(cls._search_cache),
+                "maxsize": cls._search_cache.maxsize,
+                "ttl": cls._search_cache.ttl,
+                "graph_version": cls._graph_version,
+            }
+
+    def ensure_indexes(self) -> None:
+        """Create fulltext/lookup indexes used by the search and by-id queries"""
+        with self.driver.session() as session:
+            for statement in _SCHEMA_STATEMENTS:
+                session.run(statement).consume()
+
+            for label, prop, unique in _LOOKUP_INDEXES:
+                name = f"{label.lower()}_{prop}"
+                index_statement = f"CREATE INDEX {name}_lookup IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
+                if unique:
+                    constraint_statement = (
+                        f"CREATE CONSTRAINT {name}_unique IF NOT EXISTS "
+                        f"FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE"
+                    )
+                    try:
+                        try:
+                            session.run(constraint_statement).consume()
+                        except Neo4jError as e:
+                            # A fallback index from an earlier start blocks the constraint
+                            if e.code != "Neo.ClientError.Schema.IndexAlreadyExists":
+                                raise
+                            session.run(f"DROP INDEX {name}_lookup IF EXISTS").consume()
+                            session.run(constraint_statement).consume()
+                        continue
+                    except Exception as e:
+                        logger.warning(f"Neo4j unique constraint on {label}.{prop} skipped: {e}")
+                session.run(index_statement).consume()
 
-    def _validate_identifier(self, value: str, field_name: str) -> None:
-        if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", value):
+    def backfill_search_keys(self) -> None:
+        """Set name_lc on nodes and relationships written without it"""
+        with self.driver.session() as session:
+            # CALL ... IN TRANSACTIONS needs an auto-commit query, hence session.run
+            for statement in _SEARCH_KEY_BACKFILL_STATEMENTS:
+                session.run(statement).consume()
+
+    @staticmethod
+    def _validate_identifier(value: str, field_name: str) -> None:
+        # For ASCII strings isidentifier() is exactly [A-Za-z_][A-Za-z0-9_]*
+        if not (isinstance(value, str) and value.isascii() and value.isidentifier()):
             raise ValueError(f"Invalid {field_name}: {value}")
 
-    def _format_labels(self, labels: List[str]) -> str:
+    @staticmethod
+    def _format_labels(labels: List[str]) -> str:
         for label in labels:
-            self._validate_identifier(label, "label")
-        return ":".join(labels)
+            Neo4jService._validate_identifier(label, "label")
+        # Canonical order so the same label set always yields the same query text
+        return ":".join(sorted(labels))
+
+    def _relationship_properties(self, rel_data: RelationshipCreate) -> Dict[str, Any]:
+        properties = dict(rel_data.properties or {})
+        # Merge legacy fields if provided
+        if rel_data.name is not None and "name" not in properties:
+            properties["name"] = rel_data.name
+        if rel_data.confidence is not None and "confidence" not in properties:
+            properties["confidence"] = rel_data.confidence
+        return add_search_keys(properties)
 
     def _selector_match(self, selector: NodeSelector, alias: str) -> str:
         self._validate_identifier(selector.label, "label")
         self._validate_identifier(selector.key, "key")
         return f"({alias}:{selector.label} {{{selector.key}: ${alias}_value}})"
     
+    @_invalidates_search_cache
     def create_node(self, node_data: NodeCreate) -> Dict[str, Any]:
         """Tạo node mới trong Neo4j"""
         if node_data.labels:
             labels = self._format_labels(node_data.labels)
-            properties = dict(node_data.properties or {})
-
-            # Merge legacy fields if provided
-            if node_data.id is not None and "id" not in properties:
-                properties["id"] = node_data.id
-            if node_data.name is not None and "name" not in properties:
-                properties["name"] = node_data.name
-            if node_data.type is not None and "type" not in properties:
-                properties["type"] = node_data.type
-            if node_data.category is not None and "category" not in properties:
-                properties["category"] = node_data.category
+            properties = node_properties(node_data)
 
             query = f"""
             CREATE (n:{labels})
@@ -72,24 +684,13 @@ class Neo4jService:
             SET n.created_at = datetime()
             RETURN n
             """
-            result = self.session.run(query, properties=properties)
+            record = self._write_single(query, properties=properties)
         else:
-            query = """
-            CREATE (n:STEM_NODE {
-                id: $id,
-                name: $name,
-                type: $type,
-                category: $category,
-                properties: $properties,
-                created_at: datetime()
-            })
-            RETURN n
-            """
-            result = self.session.run(query, **node_data.model_dump())
+            record = self._write_single(CREATE_NODE_CYPHER, **node_data.model_dump())
 
-        node = result.single()[0]
-        return dict(node)
+        return dict(record[0])
     
+    @_invalidates_search_cache
     def create_relationship(self, rel_data: RelationshipCreate) -> Dict[str, Any]:
         """Tạo relationship giữa các node"""
         if rel_data.from_node and rel_data.to_node:
@@ -97,11 +698,7 @@ class Neo4jService:
             match_a = self._selector_match(rel_data.from_node, "a")
             match_b = self._selector_match(rel_data.to_node, "b")
 
-            properties = dict(rel_data.properties or {})
-            if rel_data.name is not None and "name" not in properties:
-                properties["name"] = rel_data.name
-            if rel_data.confidence is not None and "confidence" not in properties:
-                properties["confidence"] = rel_data.confidence
+            properties = self._relationship_properties(rel_data)
 
             query = f"""
             MATCH {match_a}
@@ -112,35 +709,89 @@ class Neo4jService:
             RETURN a, r, b
             """
 
-            result = self.session.run(
+            record = self._write_single(
                 query,
                 a_value=rel_data.from_node.value,
                 b_value=rel_data.to_node.value,
                 properties=properties
             )
         else:
-            query = """
-            MATCH (a:STEM_NODE {id: $from_node_id})
-            MATCH (b:STEM_NODE {id: $to_node_id})
-            CREATE (a)-[r:RELATES {
-                type: $relationship_type,
-                name: $name,
-                confidence: $confidence,
-                properties: $properties,
-                created_at: datetime()
-            }]->(b)
-            RETURN a, r, b
-            """
-
-            result = self.session.run(query, **rel_data.model_dump())
+            record = self._write_single(CREATE_REL_CYPHER, **rel_data.model_dump())
 
-        record = result.single()
         return {
             "from_node": dict(record[0]),
             "relationship": dict(record[1]),
             "to_node": dict(record[2])
         }
     
+    @_invalidates_search_cache
+    def create_nodes_bulk(self, nodes: List[NodeCreate]) -> List[Dict[str, Any]]:
+        """Tạo nhiều STEM_NODE trong một transaction (UNWIND)"""
+        if not nodes:
+            return []
+        records = self._write(CREATE_NODES_BULK_CYPHER, rows=[node.model_dump() for node in nodes])
+        return [dict(record["n"]) for record in records]
+
+    @_invalidates_search_cache
+    def create_relationships_bulk(self, relationships: List[RelationshipCreate]) -> List[Dict[str, Any]]:
+        """Tạo nhiều relationship trong một transaction (một UNWIND cho mỗi nhóm cùng kiểu)"""
+        if not relationships:
+            return []
+
+        legacy_rows: List[Dict[str, Any]] = []
+        selector_groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for rel in relationships:
+            if rel.from_node and rel.to_node:
+                group_key = (
+                    rel.from_node.label,
+                    rel.from_node.key,
+                    rel.to_node.label,
+                    rel.to_node.key,
+                    rel.relationship_type
+                )
+                selector_groups.setdefault(group_key, []).append({
+                    "a": rel.from_node.value,
+                    "b": rel.to_node.value,
+                    "props": self._relationship_properties(rel)
+                })
+            else:
+                legacy_rows.append(rel.model_dump())
+
+        statements = []
+        if legacy_rows:
+            statements.append((CREATE_RELS_BULK_CYPHER, legacy_rows))
+        for (from_label, from_key, to_label, to_key, rel_type), rows in selector_groups.items():
+            self._validate_identifier(from_label, "label")
+            self._validate_identifier(from_key, "key")
+            self._validate_identifier(to_label, "label")
+            self._validate_identifier(to_key, "key")
+            self._validate_identifier(rel_type, "relationship_type")
+            query = _render_cypher(
+                _CREATE_RELS_BY_SELECTOR_TEMPLATE,
+                from_label=from_label,
+                from_key=from_key,
+                to_label=to_label,
+                to_key=to_key,
+                rel_type=rel_type
+            )
+            statements.append((query, rows))
+
+        def create_all(tx) -> List[Any]:
+            records: List[Any] = []
+            for query, rows in statements:
+                records.extend(tx.run(query, rows=rows))
+            return records
+
+        records = self._tx_write(create_all)
+        return [
+            {
+                "from_node_id": record["from_node_id"],
+                "relationship": dict(record["r"]),
+                "to_node_id": record["to_node_id"]
+            }
+            for record in records
+        ]
+
     def search_diagrams_by_triple(
         self,
         subject: str,
@@ -151,6 +802,19 @@ class Neo4jService:
         relationship_type: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Tìm diagrams phù hợp với bộ ba"""
+        cache_key = self._search_cache_key(
+            "triple",
+            (subject or "").lower(),
+            (relationship or "").lower(),
+            (object or "").lower(),
+            subject_label,
+            object_label,
+            relationship_type
+        )
+        cached = self._search_cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         if subject_label and object_label:
             self._validate_identifier(subject_label, "subject_label")
             self._validate_identifier(object_label, "object_label")
@@ -158,58 +822,35 @@ class Neo4jService:
             rel_type = relationship_type or "RELATES"
             self._validate_identifier(rel_type, "relationship_type")
 
-            query = f"""
-            MATCH (s:{subject_label})-[r:{rel_type}]->(o:{object_label})
-            WHERE toLower(s.name) CONTAINS toLower($subject)
-            AND toLower(o.name) CONTAINS toLower($object)
-            AND (
-                (exists(r.name) AND toLower(r.name) CONTAINS toLower($relationship))
-                OR toLower(type(r)) CONTAINS toLower($relationship)
+            query = _render_cypher(
+                SEARCH_TRIPLE_BY_LABEL_TEMPLATE,
+                subject_label=subject_label,
+                object_label=object_label,
+                rel_type=rel_type
             )
-            RETURN 
-                s.id as subject_id, 
-                s.name as subject_name,
-                coalesce(r.name, type(r)) as relationship,
-                o.id as object_id,
-                o.name as object_name,
-                s.category as category,
-                r.confidence as confidence,
-                coalesce(s.diagram_id, s.diagramId, r.diagram_id, r.diagramId, '') as diagram_id
-            ORDER BY r.confidence DESC
-            LIMIT 10
-            """
-            result = self.session.run(
+            result = self._read(
                 query,
-                subject=subject,
-                relationship=relationship,
-                object=object
+                subject_lc=(subject or "").lower(),
+                relationship_lc=(relationship or "").lower(),
+                object_lc=(object or "").lower()
             )
         else:
-            query = """
-            MATCH (s:STEM_NODE)-[r:RELATES]->(o:STEM_NODE)
-            WHERE toLower(s.name) CONTAINS toLower($subject)
-            AND toLower(r.name) CONTAINS toLower($relationship)
-            AND toLower(o.name) CONTAINS toLower($object)
-            RETURN 
-                s.id as subject_id, 
-                s.name as subject_name,
-                r.name as relationship,
-                o.id as object_id,
-                o.name as object_name,
-                s.category as category,
-                r.confidence as confidence,
-                coalesce(s.diagram_id, s.diagramId, r.diagram_id, r.diagramId, '') as diagram_id
-            ORDER BY r.confidence DESC
-            LIMIT 10
-            """
-            result = self.session.run(
+            subject_query = _fulltext_query(subject)
+            relationship_query = _fulltext_query(relationship)
+            object_query = _fulltext_query(object)
+            query = _search_triple_cypher(
+                subject_query is not None,
+                relationship_query is not None,
+                object_query is not None
+            )
+            result = self._read(
                 query,
-                subject=subject,
-                relationship=relationship,
-                object=object
+                subject_query=subject_query,
+                relationship_query=relationship_query,
+                object_query=object_query
             )
 
-        return [
+        rows = [
             {
                 "subject_id": record["subject_id"],
                 "subject_name": record["subject_name"],
@@ -222,292 +863,245 @@ class Neo4jService:
             }
             for record in result
         ]
+        return self._search_cache_put(cache_key, rows)
     
     def get_node_by_id(self, node_id: str) -> Optional[Dict[str, Any]]:
-        query = "MATCH (n:STEM_NODE {id: $node_id}) RETURN n"
-        result = self.session.run(query, node_id=node_id)
-        record = result.single()
+        record = self._read_single(GET_NODE_CYPHER, node_id=node_id)
         return dict(record[0]) if record else None
 
     def get_node_by_key(self, label: str, key: str, value: Any) -> Optional[Dict[str, Any]]:
         self._validate_identifier(label, "label")
         self._validate_identifier(key, "key")
-        query = f"MATCH (n:{label} {{{key}: $value}}) RETURN n"
-        result = self.session.run(query, value=value)
-        record = result.single()
+        query = _render_cypher(GET_NODE_BY_KEY_TEMPLATE, label=label, key=key)
+        record = self._read_single(query, value=value)
         return dict(record[0]) if record else None
+
+    def get_nodes_by_ids(self, node_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Lấy nhiều STEM_NODE theo id trong một truy vấn; id không tồn tại bị bỏ qua"""
+        if not node_ids:
+            return {}
+        result = self._read(GET_NODES_BY_IDS_CYPHER, node_ids=list(dict.fromkeys(node_ids)))
+        return {record["node_id"]: dict(record["n"]) for record in result}
+
+    def get_nodes_by_keys(self, label: str, key: str, values: List[Any]) -> Dict[Any, Dict[str, Any]]:
+        """Lấy nhiều node theo label + key trong một truy vấn, trả về {value: node}"""
+        self._validate_identifier(label, "label")
+        self._validate_identifier(key, "key")
+        if not values:
+            return {}
+        query = _render_cypher(GET_NODES_BY_KEYS_TEMPLATE, label=label, key=key)
+        result = self._read(query, values=list(dict.fromkeys(values)))
+        return {record["value"]: dict(record["n"]) for record in result}
+
+    def get_all_nodes_paginated(
+        self,
+        cursor: Optional[Any] = None,
+        limit: int = 100,
+        label: str = "STEM_NODE"
+    ) -> Dict[str, Any]:
+        """Phân trang theo id (keyset); next_cursor là None khi đã hết dữ liệu"""
+        self._validate_identifier(label, "label")
+        cursor_clause = "n.id IS NOT NULL" if cursor is None else "n.id > $cursor"
+        query = _render_cypher(GET_NODES_PAGE_TEMPLATE, label=label, cursor_clause=cursor_clause)
+        nodes = [dict(record["n"]) for record in self._read(query, cursor=cursor, limit=limit)]
+        next_cursor = nodes[-1].get("id") if len(nodes) == limit else None
+        return {"nodes": nodes, "next_cursor": next_cursor}
     
+    @_invalidates_search_cache
     def update_node(self, node_id: str, properties: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        query = """
-        MATCH (n:STEM_NODE {id: $node_id})
-        SET n += $properties
-        RETURN n
-        """
-        result = self.session.run(query, node_id=node_id, properties=properties)
-        record = result.single()
+        record = self._write_single(UPDATE_NODE_CYPHER, node_id=node_id, properties=add_search_keys(properties))
         return dict(record[0]) if record else None
 
+    @_invalidates_search_cache
     def update_node_by_key(self, label: str, key: str, value: Any, properties: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         self._validate_identifier(label, "label")
         self._validate_identifier(key, "key")
-        query = f"""
-        MATCH (n:{label} {{{key}: $value}})
-        SET n += $properties
-        RETURN n
-        """
-        result = self.session.run(query, value=value, properties=properties)
-        record = result.single()
+        query = _render_cypher(UPDATE_NODE_BY_KEY_TEMPLATE, label=label, key=key)
+        record = self._write_single(query, value=value, properties=add_search_keys(properties))
         return dict(record[0]) if record else None
     
+    @_invalidates_search_cache
     def delete_node(self, node_id: str) -> bool:
-        query = """
-        MATCH (n:STEM_NODE {id: $node_id})
-        DETACH DELETE n
-        RETURN COUNT(n) as deleted_count
-        """
-        result = self.session.run(query, node_id=node_id)
-        return result.single()["deleted_count"] > 0
+        return self._write_single(DELETE_NODE_CYPHER, node_id=node_id)["deleted_count"] > 0
 
+    @_invalidates_search_cache
     def delete_node_by_key(self, label: str, key: str, value: Any) -> bool:
         self._validate_identifier(label, "label")
         self._validate_identifier(key, "key")
-        query = f"""
-        MATCH (n:{label} {{{key}: $value}})
-        DETACH DELETE n
-        RETURN COUNT(n) as deleted_count
-        """
-        result = self.session.run(query, value=value)
-        return result.single()["deleted_count"] > 0
+        query = _render_cypher(DELETE_NODE_BY_KEY_TEMPLATE, label=label, key=key)
+        return self._write_single(query, value=value)["deleted_count"] > 0
     
-    def get_all_nodes(self, limit: int = 100, label: Optional[str] = None) -> List[Dict[str, Any]]:
+    def get_all_nodes(
+        self,
+        limit: int = 100,
+        label: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        label_clause = ""
         if label:
             self._validate_identifier(label, "label")
-            query = f"""
-            MATCH (n:{label})
-            RETURN n
-            LIMIT $limit
-            """
-        else:
-            query = """
-            MATCH (n)
-            RETURN n
-            LIMIT $limit
-            """
-        result = self.session.run(query, limit=limit)
+            label_clause = f":{label}"
+
+        # Only the requested properties cross the wire when fields is given
+        projection = "n"
+        if fields:
+            for field in fields:
+                self._validate_identifier(field, "field")
+            projection = "n {" + ", ".join(f".{field}" for field in sorted(set(fields))) + "}"
+
+        query = _render_cypher(GET_ALL_NODES_TEMPLATE, label_clause=label_clause, projection=projection)
+        result = self._read(query, limit=limit)
         return [dict(record["n"]) for record in result]
 
     # ========== ROOT SUBJECTS ==========
+    @_invalidates_search_cache
     def create_root_subject(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
+        def create(tx) -> Optional[Dict[str, Any]]:
             # Ensure Root node exists
-            root_check = self.session.run(
-                "MERGE (root:Root {name: 'AI2D_Knowledge_Graph'}) RETURN root"
-            ).single()
-            
-            query = """
-            MERGE (rs:RootSubject {id: $id})
-            SET rs.name = $name,
-                rs.description = $description,
-                rs.parent_id = $parent_id,
-                rs.level = $level,
-                rs.created_at = datetime()
-            RETURN rs
-            """
-            result = self.session.run(query, **data)
-            record = result.single()
-            
+            tx.run(MERGE_ROOT_CYPHER).consume()
+
+            record = tx.run(MERGE_ROOT_SUBJECT_CYPHER, data).single()
+
             if not record:
                 return None
 
             rs_node = _serialize_neo4j_dict(dict(record[0]))
 
             # Link to Root node
-            root_link = """
-            MATCH (root:Root {name: 'AI2D_Knowledge_Graph'})
-            MATCH (rs:RootSubject {id: $id})
-            MERGE (root)-[:HAS_ROOT_SUBJECT]->(rs)
-            """
-            self.session.run(root_link, id=data.get("id"))
+            tx.run(LINK_ROOT_TO_ROOT_SUBJECT_CYPHER, id=data.get("id")).consume()
 
             if data.get("parent_id") is not None:
-                rel_query = """
-                MATCH (parent:RootSubject {id: $parent_id})
-                MATCH (child:RootSubject {id: $id})
-                MERGE (parent)-[:HAS_CHILD_ROOT_SUBJECT]->(child)
-                """
-                self.session.run(rel_query, parent_id=data.get("parent_id"), id=data.get("id"))
+                tx.run(LINK_PARENT_ROOT_SUBJECT_CYPHER, parent_id=data.get("parent_id"), id=data.get("id")).consume()
 
             return rs_node
+
+        try:
+            return self._tx_write(create)
         except Exception as e:
             print(f"Neo4j create_root_subject error: {e}")
             return None
 
     def get_root_subject(self, root_subject_id: int) -> Optional[Dict[str, Any]]:
-        query = "MATCH (rs:RootSubject {id: $id}) RETURN rs"
-        result = self.session.run(query, id=root_subject_id)
-        record = result.single()
+        record = self._read_single(GET_ROOT_SUBJECT_CYPHER, id=root_subject_id)
         return dict(record["rs"]) if record else None
 
+    @_invalidates_search_cache
     def update_root_subject(self, root_subject_id: int, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        query = """
-        MATCH (rs:RootSubject {id: $id})
-        SET rs += $properties
-        RETURN rs
-        """
-        result = self.session.run(query, id=root_subject_id, properties=update_data)
-        record = result.single()
-
-        if "parent_id" in update_data:
-            rel_cleanup = """
-            MATCH (rs:RootSubject {id: $id})
-            OPTIONAL MATCH (p:RootSubject)-[r:HAS_CHILD_ROOT_SUBJECT]->(rs)
-            DELETE r
-            """
-            self.session.run(rel_cleanup, id=root_subject_id)
+        def update(tx) -> Optional[Dict[str, Any]]:
+            record = tx.run(UPDATE_ROOT_SUBJECT_CYPHER, id=root_subject_id, properties=add_search_keys(update_data)).single()
 
-            if update_data.get("parent_id") is not None:
-                rel_query = """
-                MATCH (parent:RootSubject {id: $parent_id})
-                MATCH (child:RootSubject {id: $id})
-                MERGE (parent)-[:HAS_CHILD_ROOT_SUBJECT]->(child)
-                """
-                self.session.run(rel_query, parent_id=update_data.get("parent_id"), id=root_subject_id)
+            if "parent_id" in update_data:
+                parent_id = update_data.get("parent_id")
+                current = tx.run(GET_PARENT_ROOT_SUBJECT_IDS_CYPHER, id=root_subject_id).single()["parent_ids"]
+                # Only relink when the parent actually changed
+                if current != ([] if parent_id is None else [parent_id]):
+                    if current:
+                        tx.run(UNLINK_PARENT_ROOT_SUBJECT_CYPHER, id=root_subject_id).consume()
+                    if parent_id is not None:
+                        tx.run(LINK_PARENT_ROOT_SUBJECT_CYPHER, parent_id=parent_id, id=root_subject_id).consume()
 
-        return dict(record["rs"]) if record else None
+            return dict(record["rs"]) if record else None
+
+        return self._tx_write(update)
 
+    @_invalidates_search_cache
     def delete_root_subject(self, root_subject_id: int) -> bool:
-        query = """
-        MATCH (rs:RootSubject {id: $id})
-        DETACH DELETE rs
-        RETURN COUNT(rs) as deleted_count
-        """
-        result = self.session.run(query, id=root_subject_id)
-        return result.single()["deleted_count"] > 0
+        return self._write_single(DELETE_ROOT_SUBJECT_CYPHER, id=root_subject_id)["deleted_count"] > 0
 
     # ========== SUBJECTS ==========
+    @_invalidates_search_cache
     def create_subject(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
+        def create(tx) -> Optional[Dict[str, Any]]:
             # Ensure Root node exists
-            root_check = self.session.run(
-                "MERGE (root:Root {name: 'AI2D_Knowledge_Graph'}) RETURN root"
-            ).single()
-            
-            query = """
-            MERGE (s:Subject {id: $id})
-            SET s.name = $name,
-                s.root_subject_id = $root_subject_id,
-                s.synonyms = $synonyms,
-                s.description = $description,
-                s.created_at = datetime()
-            RETURN s
-            """
-            result = self.session.run(query, **data)
-            record = result.single()
-            
+            tx.run(MERGE_ROOT_CYPHER).consume()
+
+            record = tx.run(MERGE_SUBJECT_CYPHER, data).single()
+
             if not record:
                 return None
 
             s_node = _serialize_neo4j_dict(dict(record[0]))
 
             # Link to RootSubject
-            rel_query = """
-            MATCH (rs:RootSubject {id: $root_subject_id})
-            MATCH (s:Subject {id: $id})
-            MERGE (rs)-[:HAS_SUBJECT]->(s)
-            """
-            self.session.run(rel_query, root_subject_id=data.get("root_subject_id"), id=data.get("id"))
+            tx.run(
+                LINK_SUBJECT_TO_ROOT_SUBJECT_CYPHER,
+                root_subject_id=data.get("root_subject_id"),
+                id=data.get("id")
+            ).consume()
 
             # Link to Categories if provided
             if data.get("categories"):
-                for category_name in data.get("categories", []):
-                    cat_link = """
-                    MATCH (s:Subject {id: $id})
-                    MATCH (c:Category {name: $category_name})
-                    MERGE (s)-[:BELONGS_TO_CATEGORY]->(c)
-                    """
-                    self.session.run(cat_link, id=data.get("id"), category_name=category_name)
+                tx.run(
+                    LINK_SUBJECT_TO_CATEGORIES_CYPHER,
+                    id=data.get("id"),
+                    category_names=list(dict.fromkeys(data.get("categories", [])))
+                ).consume()
 
             return s_node
+
+        try:
+            return self._tx_write(create)
         except Exception as e:
             print(f"Neo4j create_subject error: {e}")
             return None
 
     def get_subject(self, subject_id: int) -> Optional[Dict[str, Any]]:
-        query = "MATCH (s:Subject {id: $id}) RETURN s"
-        result = self.session.run(query, id=subject_id)
-        record = result.single()
+        record = self._read_single(GET_SUBJECT_CYPHER, id=subject_id)
         return dict(record["s"]) if record else None
 
+    @_invalidates_search_cache
     def update_subject(self, subject_id: int, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        query = """
-        MATCH (s:Subject {id: $id})
-        SET s += $properties
-        RETURN s
-        """
-        result = self.session.run(query, id=subject_id, properties=update_data)
-        record = result.single()
-
-        if "root_subject_id" in update_data:
-            rel_cleanup = """
-            MATCH (s:Subject {id: $id})
-            OPTIONAL MATCH (rs:RootSubject)-[r:HAS_SUBJECT]->(s)
-            DELETE r
-            """
-            self.session.run(rel_cleanup, id=subject_id)
+        def update(tx) -> Optional[Dict[str, Any]]:
+            record = tx.run(UPDATE_SUBJECT_CYPHER, id=subject_id, properties=add_search_keys(update_data)).single()
 
-            if update_data.get("root_subject_id") is not None:
-                rel_query = """
-                MATCH (rs:RootSubject {id: $root_subject_id})
-                MATCH (s:Subject {id: $id})
-                MERGE (rs)-[:HAS_SUBJECT]->(s)
-                """
-                self.session.run(rel_query, root_subject_id=update_data.get("root_subject_id"), id=subject_id)
+            if "root_subject_id" in update_data:
+                root_subject_id = update_data.get("root_subject_id")
+                current = tx.run(GET_SUBJECT_ROOT_SUBJECT_IDS_CYPHER, id=subject_id).single()["root_subject_ids"]
+                # Only relink when the root subject actually changed
+                if current != ([] if root_subject_id is None else [root_subject_id]):
+                    if current:
+                        tx.run(UNLINK_SUBJECT_FROM_ROOT_SUBJECT_CYPHER, id=subject_id).consume()
+                    if root_subject_id is not None:
+                        tx.run(LINK_SUBJECT_TO_ROOT_SUBJECT_CYPHER, root_subject_id=root_subject_id, id=subject_id).consume()
 
-        return dict(record["s"]) if record else None
+            return dict(record["s"]) if record else None
+
+        return self._tx_write(update)
 
+    @_invalidates_search_cache
     def delete_subject(self, subject_id: int) -> bool:
-        query = """
-        MATCH (s:Subject {id: $id})
-        DETACH DELETE s
-        RETURN COUNT(s) as deleted_count
-        """
-        result = self.session.run(query, id=subject_id)
-        return result.single()["deleted_count"] > 0
+        return self._write_single(DELETE_SUBJECT_CYPHER, id=subject_id)["deleted_count"] > 0
 
+    @_invalidates_search_cache
     def link_subject_to_categories(self, subject_id: int, category_names: List[str]) -> bool:
         """Link a Subject to one or more Categories for inference"""
         try:
-            for category_name in category_names:
-                query = """
-                MATCH (s:Subject {id: $subject_id})
-                MATCH (c:Category {name: $category_name})
-                MERGE (s)-[:BELONGS_TO_CATEGORY]->(c)
-                """
-                self.session.run(query, subject_id=subject_id, category_name=category_name)
+            if category_names:
+                self._write(LINK_SUBJECT_TO_CATEGORIES_CYPHER, id=subject_id, category_names=list(dict.fromkeys(category_names)))
             return True
         except Exception:
             return False
 
+    @_invalidates_search_cache
     def create_subject_relationship(self, from_subject_id: int, to_subject_id: int, 
                                    relationship_type: str, properties: Optional[Dict[str, Any]] = None) -> bool:
         """Create relationship between two Subjects (e.g., bee -[FEEDS_ON]-> flower)"""
         try:
             self._validate_identifier(relationship_type, "relationship_type")
-            props = properties or {}
+            props = add_search_keys(properties or {})
             query = f"""
-            MATCH (s1:Subject {{id: $from_id}})
-            MATCH (s2:Subject {{id: $to_id}})
+            MATCH (s1:Subject {{id: $from_id}}), (s2:Subject {{id: $to_id}})
             MERGE (s1)-[r:{relationship_type}]->(s2)
             SET r += $properties
             RETURN r
             """
-            result = self.session.run(query, from_id=from_subject_id, to_id=to_subject_id, properties=props)
-            record = result.single()
+            record = self._write_single(query, from_id=from_subject_id, to_id=to_subject_id, properties=props)
             return dict(record["r"]) if record else {}
         except Exception as e:
             logger.error(f"Error creating subject relationship: {e}")
             return {}
     
+    @_invalidates_search_cache
     def delete_relationship_between_subjects(self, from_subject_id: int, to_subject_id: int, 
                                             relationship_type: str) -> bool:
         """Delete a specific relationship between two subjects"""
@@ -518,8 +1112,7 @@ class Neo4jService:
             DELETE r
             RETURN count(r) as deleted_count
             """
-            result = self.session.run(query, from_id=from_subject_id, to_id=to_subject_id)
-            record = result.single()
+            record = self._write_single(query, from_id=from_subject_id, to_id=to_subject_id)
             return record["deleted_count"] > 0 if record else False
         except Exception as e:
             logger.error(f"Error deleting subject relationship: {e}")
@@ -527,53 +1120,50 @@ class Neo4jService:
 
     def infer_categories_from_subjects(self, subject_names: List[str]) -> List[Dict[str, Any]]:
         """Infer categories based on Subject names (e.g., 'bee', 'flower' -> 'foodChainsWebs')"""
-        query = """
-        UNWIND $subject_names AS subject_name
-        MATCH (s:Subject)
-        WHERE toLower(s.name) CONTAINS toLower(subject_name) 
-           OR any(syn IN s.synonyms WHERE toLower(syn) CONTAINS toLower(subject_name))
-        MATCH (s)-[:BELONGS_TO_CATEGORY]->(c:Category)
-        RETURN DISTINCT c.name as category_name, count(s) as subject_count
-        ORDER BY subject_count DESC
-        """
-        result = self.session.run(query, subject_names=subject_names)
-        return [dict(record) for record in result]
+        lowered_names = [name.lower() for name in subject_names]
+        cache_key = self._search_cache_key("infer_categories", tuple(lowered_names))
+        cached = self._search_cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        subject_queries = [query for query in map(_fulltext_query, lowered_names) if query]
+        if not subject_queries:
+            return []
+
+        result = self._read(INFER_CATEGORIES_CYPHER, subject_queries=subject_queries)
+        return self._search_cache_put(cache_key, [dict(record) for record in result])
 
     def find_diagrams_by_subject_inference(self, subject_names: List[str], 
                                           relationship_hint: Optional[str] = None) -> List[Dict[str, Any]]:
         """Find diagrams by inferring category from subjects (bee on flower -> foodChainsWebs diagrams)"""
-        # First, infer categories
-        inferred_categories = self.infer_categories_from_subjects(subject_names)
-        
-        if not inferred_categories:
+        lowered_names = [name.lower() for name in subject_names]
+        subject_queries = [query for query in map(_fulltext_query, lowered_names) if query]
+        if not subject_queries:
             return []
-        
-        # Get diagrams from top inferred category
-        top_category = inferred_categories[0]["category_name"]
-        
-        query = """
-        MATCH (c:Category {name: $category_name})-[:CONTAINS]->(d:Diagram)
-        OPTIONAL MATCH (d)-[:HAS_TEXT_LABEL]->(tl:TextLabel)
-        WHERE any(subject_name IN $subject_names 
-                  WHERE toLower(tl.value) CONTAINS toLower(subject_name) 
-                     OR toLower(tl.replacement_text) CONTAINS toLower(subject_name))
-        RETURN DISTINCT d.id as diagram_id, 
-               d.category as category, 
-               count(tl) as matching_labels,
-               collect(DISTINCT tl.value) as matched_text
-        ORDER BY matching_labels DESC
-        LIMIT 10
-        """
-        result = self.session.run(query, category_name=top_category, subject_names=subject_names)
+
+        # Category inference and the diagram lookup run as a single query
+        result = self._read(
+            FIND_DIAGRAMS_BY_SUBJECT_INFERENCE_CYPHER,
+            subject_queries=subject_queries,
+            subject_names=lowered_names
+        )
         
         return [{
             "diagram_id": record["diagram_id"],
             "category": record["category"],
-            "inferred_category": top_category,
+            "inferred_category": record["inferred_category"],
             "matching_labels": record["matching_labels"],
             "matched_text": record["matched_text"]
         } for record in result]
 
+    def get_text_labels_by_diagram_keys(self, keys: List[str]) -> List[Dict[str, Any]]:
+        """Text label value / replacement_text / category for the given lowered diagram keys"""
+        return [dict(record) for record in self._read(TEXT_LABELS_BY_DIAGRAM_KEYS_CYPHER, keys=keys)]
+
+    def get_text_label_blobs(self) -> List[Dict[str, Any]]:
+        """Lowered diagram_id and concatenated text of every text label"""
+        return [dict(record) for record in self._read(TEXT_LABEL_BLOBS_CYPHER)]
+
     def get_rich_graph_by_diagram(
         self,
         diagram_id: str,
@@ -581,59 +1171,22 @@ class Neo4jService:
         category_name: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Get rich subgraph around a diagram from Neo4j, including TextLabel/Blob/Arrow/ArrowHead."""
-        nodes_query = """
-        MATCH (d:Diagram {id: $diagram_id})
-        OPTIONAL MATCH (c:Category)-[:CONTAINS]->(d)
-        OPTIONAL MATCH (rc:RootCategory)-[:HAS_CATEGORY]->(c)
-        OPTIONAL MATCH (root:Root)-[:HAS_ROOT_CATEGORY]->(rc)
-        WHERE ($root_category_id IS NULL OR rc.id = $root_category_id)
-          AND ($category_name IS NULL OR c.name = $category_name)
-        WITH d, c, rc, root
-        OPTIONAL MATCH p1=(root)-[:HAS_ROOT_CATEGORY]->(rc)-[:HAS_CATEGORY]->(c)-[:CONTAINS]->(d)
-        OPTIONAL MATCH p2=(d)-[*1..2]-(detail)
-        WHERE any(lbl IN labels(detail) WHERE lbl IN ['TextLabel', 'Blob', 'Arrow', 'ArrowHead', 'ImageConst'])
-        WITH [p1, p2] AS paths
-        UNWIND paths AS p
-        WITH p WHERE p IS NOT NULL
-        UNWIND nodes(p) AS n
-        RETURN DISTINCT elementId(n) AS node_id, labels(n) AS node_labels, properties(n) AS node_props
-        """
-
-        edges_query = """
-        MATCH (d:Diagram {id: $diagram_id})
-        OPTIONAL MATCH (c:Category)-[:CONTAINS]->(d)
-        OPTIONAL MATCH (rc:RootCategory)-[:HAS_CATEGORY]->(c)
-        OPTIONAL MATCH (root:Root)-[:HAS_ROOT_CATEGORY]->(rc)
-        WHERE ($root_category_id IS NULL OR rc.id = $root_category_id)
-          AND ($category_name IS NULL OR c.name = $category_name)
-        WITH d, c, rc, root
-        OPTIONAL MATCH p1=(root)-[:HAS_ROOT_CATEGORY]->(rc)-[:HAS_CATEGORY]->(c)-[:CONTAINS]->(d)
-        OPTIONAL MATCH p2=(d)-[*1..2]-(detail)
-        WHERE any(lbl IN labels(detail) WHERE lbl IN ['TextLabel', 'Blob', 'Arrow', 'ArrowHead', 'ImageConst'])
-        WITH [p1, p2] AS paths
-        UNWIND paths AS p
-        WITH p WHERE p IS NOT NULL
-        UNWIND relationships(p) AS r
-        RETURN DISTINCT
-            elementId(r) AS edge_id,
-            elementId(startNode(r)) AS from_id,
-            elementId(endNode(r)) AS to_id,
-            type(r) AS rel_type,
-            properties(r) AS rel_props
-        """
-
         params = {
             "diagram_id": diagram_id,
             "root_category_id": root_category_id,
             "category_name": category_name,
         }
 
-        node_records = list(self.session.run(nodes_query, params))
+        def fetch_subgraph(tx):
+            node_records = list(tx.run(RICH_GRAPH_NODES_CYPHER, params))
+            if not node_records:
+                return [], []
+            return node_records, list(tx.run(RICH_GRAPH_EDGES_CYPHER, params))
+
+        node_records, edge_records = self._tx_read(fetch_subgraph)
         if not node_records:
             return {"nodes": [], "edges": []}
 
-        edge_records = list(self.session.run(edges_query, params))
-
         def detect_node_type(labels: List[str], props: Dict[str, Any]) -> str:
             if "Root" in labels:
                 return "root"
@@ -694,5 +1247,6 @@ class Neo4jService:
         return {"nodes": nodes, "edges": edges}
     
     def close(self):
-        if self.session:
-            self.session.close()
\ No newline at end of file
+        # Sessions are scoped to each call and the shared driver outlives the
+        # service, so there is nothing to release here.
+        pass
\ No newline at end of file
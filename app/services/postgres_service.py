@@ -1,10 +1,20 @@
-from sqlalchemy.orm import Session, aliased
-from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import Session, aliased, selectinload, raiseload
+from sqlalchemy import and_, or_, func, insert, update, delete, select, bindparam, any_, cast, desc, Integer, Float, Text
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY
 from app.models import postgres_models as models
 from app.schemas import postgres_schemas as schemas
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator
+import csv
+import io
 import re
 
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _contains_pattern(term: str) -> str:
+    """ILIKE pattern for a substring match; LIKE wildcards in the term are matched literally"""
+    return f"%{_escape_like(term)}%"
+
 def _derive_root_code(raw_value: Optional[str]) -> str:
     if not raw_value:
         return "UNK"
@@ -57,42 +67,208 @@ def _next_subject_sequence(db: Session, root_code: str) -> int:
             max_seq = max(max_seq, int(suffix))
     return max_seq + 1
 
+# Primary-key lookups built once at import; the id is a bound parameter, so
+# every call reuses the engine's compiled-statement cache entry
+def _by_id(model):
+    return select(model).where(model.id == bindparam("id"))
+
+_ROOT_CATEGORY_BY_ID = _by_id(models.RootCategory)
+_CATEGORY_BY_ID = _by_id(models.Category)
+_DIAGRAM_BY_ID = _by_id(models.Diagram)
+_ROOT_SUBJECT_BY_ID = _by_id(models.RootSubject)
+_SUBJECT_BY_ID = _by_id(models.Subject)
+_RELATIONSHIP_BY_ID = _by_id(models.Relationship)
+_SRO_BY_ID = _by_id(models.SubjectRelationshipObject)
+
+# id = ANY(:ids) with an int[] parameter: one cached plan for any number of ids
+def _by_ids(model):
+    return select(model).where(model.id == any_(bindparam("ids", type_=ARRAY(Integer))))
+
+_SUBJECTS_BY_IDS = _by_ids(models.Subject)
+_RELATIONSHIPS_BY_IDS = _by_ids(models.Relationship)
+_SROS_BY_IDS = _by_ids(models.SubjectRelationshipObject)
+
+def _build_triple_category_search():
+    """Category ranking for a (subject, relationship, object) ILIKE triple, built once.
+
+    Each term is resolved against its own table first (trigram-indexed, see
+    database/add_search_indexes.sql); SROs are then joined on ids only.
+    """
+    def matched_subjects(pattern_name: str, cte_name: str):
+        pattern = bindparam(pattern_name)
+        synonyms_text = func.coalesce(cast(models.Subject.synonyms, Text), "")
+        return select(models.Subject.id)\
+            .where(or_(models.Subject.name.ilike(pattern), synonyms_text.ilike(pattern)))\
+            .cte(cte_name)
+
+    subjects = matched_subjects("subject_pattern", "matched_subjects")
+    objects = matched_subjects("object_pattern", "matched_objects")
+
+    # Relationships matching by name, or sharing a name with one whose inverse matches
+    rel_pattern = bindparam("rel_pattern")
+    inverse = aliased(models.Relationship)
+    relationships = select(models.Relationship.id)\
+        .outerjoin(inverse, and_(
+            inverse.name == models.Relationship.name,
+            inverse.inverse_relationship.ilike(rel_pattern)
+        ))\
+        .where(or_(models.Relationship.name.ilike(rel_pattern), inverse.id.isnot(None)))\
+        .distinct()\
+        .cte("matched_relationships")
+
+    sro = models.SubjectRelationshipObject
+    match_count = func.count(sro.id)
+    avg_confidence = func.avg(sro.confidence_score)
+    return select(
+            models.Category.id.label("category_id"),
+            models.Category.name.label("category_name"),
+            models.RootCategory.name.label("root_category"),
+            match_count.label("match_count"),
+            avg_confidence.label("avg_confidence"),
+            (match_count * 0.5 + func.coalesce(avg_confidence, 0) * 0.5).label("relevance_score")
+        )\
+        .select_from(sro)\
+        .join(subjects, subjects.c.id == sro.subject_id)\
+        .join(relationships, relationships.c.id == sro.relationship_id)\
+        .join(objects, objects.c.id == sro.object_id)\
+        .join(models.Diagram, models.Diagram.id == sro.diagram_id)\
+        .join(models.Category, models.Category.id == models.Diagram.category_id)\
+        .outerjoin(models.RootCategory, models.RootCategory.id == models.Category.root_category_id)\
+        .group_by(models.Category.id, models.Category.name, models.RootCategory.name)\
+        .order_by(desc("relevance_score"))
+
+_TRIPLE_CATEGORY_SEARCH = _build_triple_category_search()
+
+_SRO_COPY_COLUMNS = ("subject_id", "relationship_id", "object_id", "diagram_id", "confidence_score", "context")
+# CSV with QUOTE_NONNUMERIC: strings are quoted, so an unquoted empty field is NULL
+_SRO_COPY_SQL = f"COPY subject_relationship_object ({', '.join(_SRO_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+# Rows per INSERT ... RETURNING statement; keeps bind parameters well under
+# PostgreSQL's 65535 limit for the widest table
+_INSERT_BATCH_SIZE = 1000
+
 class PostgresService:
     def __init__(self, db: Session):
         self.db = db
+        # Request-scoped lookup caches (one service instance per request); only
+        # hits are cached, and update_*/delete_* drop the affected entries
+        self._root_category_cache: Dict[str, models.RootCategory] = {}
+        self._category_cache: Dict[int, models.Category] = {}
+        self._relationship_by_name_cache: Dict[str, models.Relationship] = {}
+
+    def _insert_returning(self, model, rows: List[Dict[str, Any]], batch_size: int = _INSERT_BATCH_SIZE) -> List[Any]:
+        statement = insert(model).returning(model, sort_by_parameter_order=True)
+        created = []
+        try:
+            for start in range(0, len(rows), batch_size):
+                created.extend(self.db.scalars(statement, rows[start:start + batch_size]).all())
+            # RETURNING already loaded every column; detach so the commit does
+            # not expire them and trigger a refresh SELECT per row.
+            for obj in created:
+                self.db.expunge(obj)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return created
+
+    def _update_returning(self, model, entity_id: Any, values: Dict[str, Any]) -> Optional[Any]:
+        """UPDATE ... RETURNING in one round-trip; None when the row does not exist"""
+        if not values:
+            return self.db.execute(_by_id(model), {"id": entity_id}).scalar_one_or_none()
+        statement = (
+            update(model)
+            .where(model.id == entity_id)
+            .values(**values)
+            .returning(model)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        try:
+            updated = self.db.execute(statement).scalar_one_or_none()
+            # Same as _insert_returning: keep the RETURNING values past the commit
+            if updated is not None:
+                self.db.expunge(updated)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return updated
+
+    def _upsert_returning(self, model, values: Dict[str, Any]) -> Any:
+        """INSERT ... ON CONFLICT (id) DO UPDATE ... RETURNING: create or update atomically in one round-trip"""
+        statement = pg_insert(model).values(**values)
+        statement = (
+            statement.on_conflict_do_update(
+                index_elements=[model.id],
+                set_={key: statement.excluded[key] for key in values if key != "id"}
+            )
+            .returning(model)
+            .execution_options(populate_existing=True)
+        )
+        try:
+            row = self.db.execute(statement).scalar_one()
+            self.db.expunge(row)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return row
+
+    def _page(self, model, skip: int, limit: int, after_id: Optional[Any]) -> List[Any]:
+        """Ordered by id; after_id switches from OFFSET to keyset paging (WHERE id > :after_id)"""
+        query = self.db.query(model)
+        if after_id is not None:
+            query = query.filter(model.id > after_id)
+        else:
+            query = query.offset(skip)
+        return query.order_by(model.id).limit(limit).all()
+
+    def _read_many(self, stmt) -> List[Any]:
+        """Run a Core select and return plain mapping rows (no ORM hydration / identity map)"""
+        return self.db.execute(stmt).mappings().all()
     
     # ========== ROOT CATEGORIES ==========
     def create_root_category(self, category: schemas.RootCategoryCreate) -> models.RootCategory:
         category_data = category.model_dump()
         if not category_data.get("code"):
             category_data["code"] = _derive_root_code(category_data.get("id"))
-        db_category = models.RootCategory(**category_data)
-        self.db.add(db_category)
-        self.db.commit()
-        self.db.refresh(db_category)
-        return db_category
+        return self._insert_returning(models.RootCategory, [category_data])[0]
+    
+    def create_root_categories_bulk(self, categories: List[schemas.RootCategoryCreate]) -> List[models.RootCategory]:
+        """Insert many root categories with batched INSERT ... RETURNING and a single commit"""
+        rows = []
+        for category in categories:
+            category_data = category.model_dump()
+            if not category_data.get("code"):
+                category_data["code"] = _derive_root_code(category_data.get("id"))
+            rows.append(category_data)
+        return self._insert_returning(models.RootCategory, rows) if rows else []
     
     def get_root_category(self, category_id: str) -> Optional[models.RootCategory]:
-        return self.db.query(models.RootCategory).filter(models.RootCategory.id == category_id).first()
+        if category_id in self._root_category_cache:
+            return self._root_category_cache[category_id]
+        db_category = self.db.execute(_ROOT_CATEGORY_BY_ID, {"id": category_id}).scalar_one_or_none()
+        if db_category is not None:
+            self._root_category_cache[category_id] = db_category
+        return db_category
     
     def get_all_root_categories(self) -> List[models.RootCategory]:
         return self.db.query(models.RootCategory).all()
     
     def update_root_category(self, category_id: str, category_update: schemas.RootCategoryUpdate) -> Optional[models.RootCategory]:
-        db_category = self.get_root_category(category_id)
-        if db_category:
-            update_data = category_update.model_dump(exclude_unset=True)
-            if "code" not in update_data and not db_category.code:
-                update_data["code"] = _derive_root_code(db_category.id)
-            for key, value in update_data.items():
-                setattr(db_category, key, value)
-            self.db.commit()
-            self.db.refresh(db_category)
-        return db_category
+        update_data = category_update.model_dump(exclude_unset=True)
+        if "code" not in update_data:
+            # Fill a missing code in the same statement instead of reading the row first
+            update_data["code"] = func.coalesce(
+                func.nullif(models.RootCategory.code, ""), _derive_root_code(category_id)
+            )
+        self._root_category_cache.pop(category_id, None)
+        return self._update_returning(models.RootCategory, category_id, update_data)
     
     def delete_root_category(self, category_id: str) -> bool:
         db_category = self.get_root_category(category_id)
         if db_category:
+            self._root_category_cache.pop(category_id, None)
             self.db.delete(db_category)
             self.db.commit()
             return True
@@ -108,42 +284,65 @@ class PostgresService:
         category_data = category.model_dump()
         category_data["level"] = level
         category_data["code"] = f"CAT-{root_code}-{level}"
-        db_category = models.Category(**category_data)
-        self.db.add(db_category)
-        self.db.commit()
-        self.db.refresh(db_category)
-        return db_category
+        return self._insert_returning(models.Category, [category_data])[0]
+    
+    def create_categories_bulk(self, categories: List[schemas.CategoryCreate]) -> List[models.Category]:
+        """Insert many categories with batched INSERT ... RETURNING and a single commit"""
+        if not categories:
+            return []
+        root_ids = {category.root_category_id for category in categories}
+        root_categories = {
+            root.id: root
+            for root in self.db.query(models.RootCategory).filter(models.RootCategory.id.in_(root_ids))
+        }
+        rows = []
+        for category in categories:
+            root_category = root_categories.get(category.root_category_id)
+            if not root_category:
+                raise ValueError(f"Root category not found: {category.root_category_id}")
+            root_code = root_category.code or _derive_root_code(root_category.id)
+            category_data = category.model_dump()
+            category_data["level"] = category.level if category.level is not None else 1
+            category_data["code"] = f"CAT-{root_code}-{category_data['level']}"
+            rows.append(category_data)
+        return self._insert_returning(models.Category, rows)
     
     def get_category(self, category_id: int) -> Optional[models.Category]:
-        return self.db.query(models.Category).filter(models.Category.id == category_id).first()
+        if category_id in self._category_cache:
+            return self._category_cache[category_id]
+        db_category = self.db.execute(_CATEGORY_BY_ID, {"id": category_id}).scalar_one_or_none()
+        if db_category is not None:
+            self._category_cache[category_id] = db_category
+        return db_category
     
     def get_categories_by_root(self, root_category_id: str) -> List[models.Category]:
         return self.db.query(models.Category).filter(models.Category.root_category_id == root_category_id).all()
     
-    def get_all_categories(self, skip: int = 0, limit: int = 100) -> List[models.Category]:
-        return self.db.query(models.Category).offset(skip).limit(limit).all()
+    def get_all_categories(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[models.Category]:
+        return self._page(models.Category, skip, limit, after_id)
     
     def update_category(self, category_id: int, category_update: schemas.CategoryUpdate) -> Optional[models.Category]:
-        db_category = self.get_category(category_id)
-        if db_category:
-            update_data = category_update.model_dump(exclude_unset=True)
-            if "root_category_id" in update_data or "level" in update_data:
-                root_category_id = update_data.get("root_category_id", db_category.root_category_id)
-                root_category = self.get_root_category(root_category_id)
-                if not root_category:
-                    raise ValueError("Root category not found")
-                level = update_data.get("level", db_category.level)
-                root_code = root_category.code or _derive_root_code(root_category.id)
-                update_data["code"] = f"CAT-{root_code}-{level}"
-            for key, value in update_data.items():
-                setattr(db_category, key, value)
-            self.db.commit()
-            self.db.refresh(db_category)
-        return db_category
+        update_data = category_update.model_dump(exclude_unset=True)
+        if "root_category_id" in update_data or "level" in update_data:
+            # The code depends on the current row only when one of the two is missing
+            if "root_category_id" not in update_data or "level" not in update_data:
+                db_category = self.get_category(category_id)
+                if not db_category:
+                    return None
+                update_data.setdefault("root_category_id", db_category.root_category_id)
+                update_data.setdefault("level", db_category.level)
+            root_category = self.get_root_category(update_data["root_category_id"])
+            if not root_category:
+                raise ValueError("Root category not found")
+            root_code = root_category.code or _derive_root_code(root_category.id)
+            update_data["code"] = f"CAT-{root_code}-{update_data['level']}"
+        self._category_cache.pop(category_id, None)
+        return self._update_returning(models.Category, category_id, update_data)
     
     def delete_category(self, category_id: int) -> bool:
         db_category = self.get_category(category_id)
         if db_category:
+            self._category_cache.pop(category_id, None)
             self.db.delete(db_category)
             self.db.commit()
             return True
@@ -151,32 +350,27 @@ class PostgresService:
     
     # ========== DIAGRAMS ==========
     def create_diagram(self, diagram: schemas.DiagramCreate) -> models.Diagram:
-        db_diagram = models.Diagram(**diagram.model_dump())
-        self.db.add(db_diagram)
-        self.db.commit()
-        self.db.refresh(db_diagram)
-        return db_diagram
+        return self._insert_returning(models.Diagram, [diagram.model_dump()])[0]
+    
+    def create_diagrams_bulk(self, diagrams: List[schemas.DiagramCreate]) -> List[models.Diagram]:
+        """Insert many diagrams with batched INSERT ... RETURNING and a single commit"""
+        if not diagrams:
+            return []
+        return self._insert_returning(models.Diagram, [diagram.model_dump() for diagram in diagrams])
     
     def get_diagram(self, diagram_id: str) -> Optional[models.Diagram]:
-        return self.db.query(models.Diagram).filter(models.Diagram.id == diagram_id).first()
+        return self.db.execute(_DIAGRAM_BY_ID, {"id": diagram_id}).scalar_one_or_none()
     
     def get_diagrams_by_category(self, category_id: int, skip: int = 0, limit: int = 100) -> List[models.Diagram]:
         return self.db.query(models.Diagram)\
             .filter(models.Diagram.category_id == category_id)\
             .offset(skip).limit(limit).all()
     
-    def get_all_diagrams(self, skip: int = 0, limit: int = 100) -> List[models.Diagram]:
-        return self.db.query(models.Diagram).offset(skip).limit(limit).all()
+    def get_all_diagrams(self, skip: int = 0, limit: int = 100, after_id: Optional[str] = None) -> List[models.Diagram]:
+        return self._page(models.Diagram, skip, limit, after_id)
     
     def update_diagram(self, diagram_id: str, diagram_update: schemas.DiagramUpdate) -> Optional[models.Diagram]:
-        db_diagram = self.get_diagram(diagram_id)
-        if db_diagram:
-            update_data = diagram_update.model_dump(exclude_unset=True)
-            for key, value in update_data.items():
-                setattr(db_diagram, key, value)
-            self.db.commit()
-            self.db.refresh(db_diagram)
-        return db_diagram
+        return self._update_returning(models.Diagram, diagram_id, diagram_update.model_dump(exclude_unset=True))
     
     def delete_diagram(self, diagram_id: str) -> bool:
         db_diagram = self.get_diagram(diagram_id)
@@ -189,72 +383,44 @@ class PostgresService:
     # ========== ROOT SUBJECTS ==========
     def create_root_subject(self, root_subject: schemas.RootSubjectCreate) -> models.RootSubject:
         """Create or update root subject. If id provided and exists, update instead of insert."""
-        # Check if id is provided and already exists
-        if hasattr(root_subject, 'id') and root_subject.id:
-            existing = self.get_root_subject(root_subject.id)
-            if existing:
-                # Update the existing record
-                return self.update_root_subject(root_subject.id, schemas.RootSubjectUpdate(**root_subject.model_dump(exclude={'id'})))
-        
-        # Create new record
         root_subject_data = root_subject.model_dump(exclude={'id'} if not root_subject.id else set())
         if not root_subject_data.get("code"):
             root_subject_data["code"] = _derive_root_code(root_subject_data.get("name"))
-        db_root_subject = models.RootSubject(**root_subject_data)
-        self.db.add(db_root_subject)
-        try:
-            self.db.commit()
-            self.db.refresh(db_root_subject)
-        except Exception as e:
-            self.db.rollback()
-            # If duplicate key error, try to fetch and return existing
-            if 'duplicate' in str(e).lower() or 'unique' in str(e).lower():
-                # Try to extract id from error or from request
-                if hasattr(root_subject, 'id') and root_subject.id:
-                    existing = self.get_root_subject(root_subject.id)
-                    if existing:
-                        return existing
-            raise
-        return db_root_subject
+        return self._upsert_returning(models.RootSubject, root_subject_data)
     
     def get_root_subject(self, root_subject_id: int) -> Optional[models.RootSubject]:
-        return self.db.query(models.RootSubject).filter(models.RootSubject.id == root_subject_id).first()
+        return self.db.execute(_ROOT_SUBJECT_BY_ID, {"id": root_subject_id}).scalar_one_or_none()
     
-    def get_all_root_subjects(self, skip: int = 0, limit: int = 100) -> List[models.RootSubject]:
-        return self.db.query(models.RootSubject).offset(skip).limit(limit).all()
+    def get_all_root_subjects(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[models.RootSubject]:
+        return self._page(models.RootSubject, skip, limit, after_id)
     
     def get_root_subjects_by_level(self, level: int) -> List[models.RootSubject]:
         return self.db.query(models.RootSubject).filter(models.RootSubject.level == level).all()
     
     def update_root_subject(self, root_subject_id: int, root_subject_update: schemas.RootSubjectUpdate) -> Optional[models.RootSubject]:
-        db_root_subject = self.get_root_subject(root_subject_id)
-        if db_root_subject:
-            update_data = root_subject_update.model_dump(exclude_unset=True)
-            if "name" in update_data and "code" not in update_data:
-                update_data["code"] = _derive_root_code(update_data.get("name"))
-            for key, value in update_data.items():
-                setattr(db_root_subject, key, value)
-            self.db.commit()
-            self.db.refresh(db_root_subject)
-        return db_root_subject
+        update_data = root_subject_update.model_dump(exclude_unset=True)
+        if "name" in update_data and "code" not in update_data:
+            update_data["code"] = _derive_root_code(update_data.get("name"))
+        return self._update_returning(models.RootSubject, root_subject_id, update_data)
     
     def delete_root_subject(self, root_subject_id: int) -> bool:
         try:
-            # First delete all subjects related to this root_subject
-            subjects = self.get_subjects_by_root(root_subject_id, skip=0, limit=10000)
-            for subject in subjects:
-                self.delete_subject(subject.id)
-            
-            # Then delete the root_subject itself
-            db_root_subject = self.db.query(models.RootSubject).filter(
-                models.RootSubject.id == root_subject_id
-            ).first()
-            
-            if db_root_subject:
-                self.db.delete(db_root_subject)
-                self.db.commit()
-                return True
-            return False
+            # Set-based statements in one transaction: delete every subject of this
+            # root_subject, detach child root_subjects (as the ORM delete did), then
+            # delete the root_subject itself
+            self.db.execute(
+                delete(models.Subject).where(models.Subject.root_subject_id == root_subject_id)
+            )
+            self.db.execute(
+                update(models.RootSubject)
+                .where(models.RootSubject.parent_id == root_subject_id)
+                .values(parent_id=None)
+            )
+            deleted = self.db.execute(
+                delete(models.RootSubject).where(models.RootSubject.id == root_subject_id)
+            ).rowcount
+            self.db.commit()
+            return deleted > 0
         except Exception as e:
             self.db.rollback()
             raise
@@ -262,15 +428,10 @@ class PostgresService:
     # ========== SUBJECTS ==========
     def create_subject(self, subject: schemas.SubjectCreate) -> models.Subject:
         """Create or update subject. If id provided and exists, update instead of insert."""
-        # Check if id is provided and already exists
-        if hasattr(subject, 'id') and subject.id:
-            existing = self.get_subject(subject.id)
-            if existing:
-                # Update the existing record
-                return self.update_subject(subject.id, schemas.SubjectUpdate(**subject.model_dump(exclude={'id'})))
-        
-        # Create new record
-        subject_data = subject.model_dump(exclude={'id'} if not subject.id else set())
+        subject_data = subject.model_dump()
+        subject_id = getattr(subject, "id", None)
+        if subject_id:
+            subject_data["id"] = subject_id
         root_subject = self.get_root_subject(subject.root_subject_id)
         if not root_subject:
             raise ValueError("Root subject not found")
@@ -278,59 +439,83 @@ class PostgresService:
         root_code = _derive_root_code(root_code_source)
         seq = _next_subject_sequence(self.db, root_code)
         subject_data["code"] = f"SUB-{root_code}-{seq:03d}"
-        db_subject = models.Subject(**subject_data)
-        self.db.add(db_subject)
-        try:
-            self.db.commit()
-            self.db.refresh(db_subject)
-        except Exception as e:
-            self.db.rollback()
-            # If duplicate key error, try to fetch and return existing
-            if 'duplicate' in str(e).lower() or 'unique' in str(e).lower():
-                # Try to extract id from error or from request
-                if hasattr(subject, 'id') and subject.id:
-                    existing = self.get_subject(subject.id)
-                    if existing:
-                        return existing
-            raise
-        return db_subject
+        return self._upsert_returning(models.Subject, subject_data)
     
+    def create_subjects_bulk(self, subjects: List[schemas.SubjectCreate]) -> List[models.Subject]:
+        """Insert many subjects with one INSERT ... RETURNING and a single commit"""
+        if not subjects:
+            return []
+        root_subject_ids = {subject.root_subject_id for subject in subjects}
+        root_subjects = {
+            root_subject.id: root_subject
+            for root_subject in self.db.query(models.RootSubject)
+            .filter(models.RootSubject.id.in_(root_subject_ids))
+            .all()
+        }
+        missing = root_subject_ids - root_subjects.keys()
+        if missing:
+            raise ValueError(f"Root subject not found: {sorted(missing)}")
+
+        # Continue each root's SUB-{root}-NNN sequence locally instead of per row
+        next_seq: Dict[str, int] = {}
+        rows = []
+        for subject in subjects:
+            root_subject = root_subjects[subject.root_subject_id]
+            root_code = _derive_root_code(root_subject.code or root_subject.name)
+            if root_code not in next_seq:
+                next_seq[root_code] = _next_subject_sequence(self.db, root_code)
+            subject_data = subject.model_dump()
+            subject_data["code"] = f"SUB-{root_code}-{next_seq[root_code]:03d}"
+            next_seq[root_code] += 1
+            rows.append(subject_data)
+
+        return self._insert_returning(models.Subject, rows)
+
     def get_subject(self, subject_id: int) -> Optional[models.Subject]:
-        return self.db.query(models.Subject).filter(models.Subject.id == subject_id).first()
+        return self.db.execute(_SUBJECT_BY_ID, {"id": subject_id}).scalar_one_or_none()
+    
+    def get_subjects_by_ids(self, subject_ids: List[int]) -> List[models.Subject]:
+        if not subject_ids:
+            return []
+        return self.db.execute(_SUBJECTS_BY_IDS, {"ids": list(set(subject_ids))}).scalars().all()
     
     def get_subjects_by_root(self, root_subject_id: int, skip: int = 0, limit: int = 100) -> List[models.Subject]:
         return self.db.query(models.Subject)\
             .filter(models.Subject.root_subject_id == root_subject_id)\
+            .order_by(models.Subject.id)\
             .offset(skip).limit(limit).all()
     
-    def get_all_subjects(self, skip: int = 0, limit: int = 100) -> List[models.Subject]:
-        return self.db.query(models.Subject).offset(skip).limit(limit).all()
+    def get_all_subjects(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[models.Subject]:
+        return self._page(models.Subject, skip, limit, after_id)
     
     def search_subjects(self, name: Optional[str] = None, root_subject_id: Optional[int] = None) -> List[models.Subject]:
         query = self.db.query(models.Subject)
         if name:
-            query = query.filter(models.Subject.name.ilike(f"%{name}%"))
+            query = query.filter(models.Subject.name.ilike(_contains_pattern(name)))
         if root_subject_id:
             query = query.filter(models.Subject.root_subject_id == root_subject_id)
         return query.all()
     
+    def search_subjects_prefix(self, prefix: str, limit: int = 20) -> List[models.Subject]:
+        """Autocomplete: case-insensitive name prefix match, served by idx_subjects_lower_name"""
+        if not prefix:
+            return []
+        return self.db.query(models.Subject)\
+            .filter(func.lower(models.Subject.name).like(func.lower(f"{_escape_like(prefix)}%")))\
+            .order_by(func.lower(models.Subject.name))\
+            .limit(limit).all()
+    
     def update_subject(self, subject_id: int, subject_update: schemas.SubjectUpdate) -> Optional[models.Subject]:
-        db_subject = self.get_subject(subject_id)
-        if db_subject:
-            update_data = subject_update.model_dump(exclude_unset=True)
-            if "root_subject_id" in update_data:
-                root_subject = self.get_root_subject(update_data.get("root_subject_id"))
-                if not root_subject:
-                    raise ValueError("Root subject not found")
-                root_code_source = root_subject.code or root_subject.name
-                root_code = _derive_root_code(root_code_source)
-                seq = _next_subject_sequence(self.db, root_code)
-                update_data["code"] = f"SUB-{root_code}-{seq:03d}"
-            for key, value in update_data.items():
-                setattr(db_subject, key, value)
-            self.db.commit()
-            self.db.refresh(db_subject)
-        return db_subject
+        update_data = subject_update.model_dump(exclude_unset=True)
+        if "root_subject_id" in update_data:
+            root_subject = self.get_root_subject(update_data.get("root_subject_id"))
+            if not root_subject:
+                raise ValueError("Root subject not found")
+            root_code_source = root_subject.code or root_subject.name
+            root_code = _derive_root_code(root_code_source)
+            seq = _next_subject_sequence(self.db, root_code)
+            update_data["code"] = f"SUB-{root_code}-{seq:03d}"
+        return self._update_returning(models.Subject, subject_id, update_data)
     
     def delete_subject(self, subject_id: int) -> bool:
         db_subject = self.get_subject(subject_id)
@@ -349,43 +534,66 @@ class PostgresService:
                 relationship_data.get("semantic_type"),
                 relationship_data.get("name")
             )
-        db_relationship = models.Relationship(**relationship_data)
-        self.db.add(db_relationship)
-        self.db.commit()
-        self.db.refresh(db_relationship)
-        return db_relationship
+        return self._insert_returning(models.Relationship, [relationship_data])[0]
+    
+    def create_relationships_bulk(self, relationships: List[schemas.RelationshipCreate]) -> List[models.Relationship]:
+        """Insert many relationships with batched INSERT ... RETURNING and a single commit"""
+        rows = []
+        for relationship in relationships:
+            relationship_data = relationship.model_dump()
+            if not relationship_data.get("code"):
+                relationship_data["code"] = _derive_relationship_code(
+                    relationship_data.get("semantic_type"),
+                    relationship_data.get("name")
+                )
+            rows.append(relationship_data)
+        return self._insert_returning(models.Relationship, rows) if rows else []
     
     def get_relationship(self, relationship_id: int) -> Optional[models.Relationship]:
-        return self.db.query(models.Relationship).filter(models.Relationship.id == relationship_id).first()
+        return self.db.execute(_RELATIONSHIP_BY_ID, {"id": relationship_id}).scalar_one_or_none()
+    
+    def get_relationships_by_ids(self, relationship_ids: List[int]) -> List[models.Relationship]:
+        if not relationship_ids:
+            return []
+        return self.db.execute(_RELATIONSHIPS_BY_IDS, {"ids": list(set(relationship_ids))}).scalars().all()
     
     def get_relationship_by_name(self, name: str) -> Optional[models.Relationship]:
-        return self.db.query(models.Relationship).filter(models.Relationship.name == name).first()
+        if name in self._relationship_by_name_cache:
+            return self._relationship_by_name_cache[name]
+        db_relationship = self.db.query(models.Relationship).filter(models.Relationship.name == name).first()
+        if db_relationship is not None:
+            self._relationship_by_name_cache[name] = db_relationship
+        return db_relationship
     
-    def get_all_relationships(self, skip: int = 0, limit: int = 100) -> List[models.Relationship]:
-        return self.db.query(models.Relationship).offset(skip).limit(limit).all()
+    def get_all_relationships(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[models.Relationship]:
+        return self._page(models.Relationship, skip, limit, after_id)
     
     def get_relationships_by_type(self, semantic_type: str) -> List[models.Relationship]:
         return self.db.query(models.Relationship).filter(models.Relationship.semantic_type == semantic_type).all()
     
     def update_relationship(self, relationship_id: int, relationship_update: schemas.RelationshipUpdate) -> Optional[models.Relationship]:
-        db_relationship = self.get_relationship(relationship_id)
-        if db_relationship:
-            update_data = relationship_update.model_dump(exclude_unset=True)
-            # Auto-update code if name or semantic_type changed
-            if "name" in update_data or "semantic_type" in update_data:
+        update_data = relationship_update.model_dump(exclude_unset=True)
+        # Auto-update code if name or semantic_type changed
+        if "name" in update_data or "semantic_type" in update_data:
+            if "name" in update_data and "semantic_type" in update_data:
+                new_semantic_type, new_name = update_data["semantic_type"], update_data["name"]
+            else:
+                # The unchanged half of the code comes from the current row
+                db_relationship = self.get_relationship(relationship_id)
+                if not db_relationship:
+                    return None
                 new_semantic_type = update_data.get("semantic_type", db_relationship.semantic_type)
                 new_name = update_data.get("name", db_relationship.name)
-                # Always regenerate code when name or semantic_type changes
-                update_data["code"] = _derive_relationship_code(new_semantic_type, new_name)
-            for key, value in update_data.items():
-                setattr(db_relationship, key, value)
-            self.db.commit()
-            self.db.refresh(db_relationship)
-        return db_relationship
+            # Always regenerate code when name or semantic_type changes
+            update_data["code"] = _derive_relationship_code(new_semantic_type, new_name)
+        # Names can change, so the by-name cache cannot be invalidated per key
+        self._relationship_by_name_cache.clear()
+        return self._update_returning(models.Relationship, relationship_id, update_data)
     
     def delete_relationship(self, relationship_id: int) -> bool:
         db_relationship = self.get_relationship(relationship_id)
         if db_relationship:
+            self._relationship_by_name_cache.pop(db_relationship.name, None)
             self.db.delete(db_relationship)
             self.db.commit()
             return True
@@ -393,15 +601,41 @@ class PostgresService:
     
     # ========== SUBJECT-RELATIONSHIP-OBJECT (SRO) ==========
     def create_sro(self, sro: schemas.SROCreate) -> models.SubjectRelationshipObject:
-        db_sro = models.SubjectRelationshipObject(**sro.model_dump())
-        self.db.add(db_sro)
-        self.db.commit()
-        self.db.refresh(db_sro)
-        return db_sro
+        return self.create_sros_bulk([sro])[0]
+    
+    def create_sros_bulk(self, sros: List[schemas.SROCreate]) -> List[models.SubjectRelationshipObject]:
+        """Insert many SROs with batched INSERT ... RETURNING and a single commit"""
+        if not sros:
+            return []
+        return self._insert_returning(models.SubjectRelationshipObject, [sro.model_dump() for sro in sros])
+    
+    def bulk_copy_sros(self, sros: List[schemas.SROCreate]) -> int:
+        """Load SROs with COPY ... FROM STDIN for mass imports; returns the row count, not the rows"""
+        if not sros:
+            return 0
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for sro in sros:
+            writer.writerow([getattr(sro, column) for column in _SRO_COPY_COLUMNS])
+        buffer.seek(0)
+        try:
+            # COPY runs on the session's own connection, inside its transaction
+            raw_connection = self.db.connection().connection
+            with raw_connection.cursor() as cursor:
+                cursor.copy_expert(_SRO_COPY_SQL, buffer)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return len(sros)
     
     def get_sro(self, sro_id: int) -> Optional[models.SubjectRelationshipObject]:
-        return self.db.query(models.SubjectRelationshipObject)\
-            .filter(models.SubjectRelationshipObject.id == sro_id).first()
+        return self.db.execute(_SRO_BY_ID, {"id": sro_id}).scalar_one_or_none()
+    
+    def get_sros_by_ids(self, sro_ids: List[int]) -> List[models.SubjectRelationshipObject]:
+        if not sro_ids:
+            return []
+        return self.db.execute(_SROS_BY_IDS, {"ids": list(set(sro_ids))}).scalars().all()
     
     def get_sro_by_triple(self, subject_id: int, relationship_id: int, object_id: int) -> Optional[models.SubjectRelationshipObject]:
         return self.db.query(models.SubjectRelationshipObject)\
@@ -411,20 +645,62 @@ class PostgresService:
                 models.SubjectRelationshipObject.object_id == object_id
             ).first()
     
-    def get_all_sros(self, skip: int = 0, limit: int = 100) -> List[models.SubjectRelationshipObject]:
-        return self.db.query(models.SubjectRelationshipObject)\
-            .offset(skip).limit(limit).all()
+    def get_all_sros(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[Any]:
+        """Same paging as _page, but returns column mappings for serialization"""
+        sro = models.SubjectRelationshipObject
+        stmt = select(*sro.__table__.c)
+        if after_id is not None:
+            stmt = stmt.where(sro.id > after_id)
+        else:
+            stmt = stmt.offset(skip)
+        return self._read_many(stmt.order_by(sro.id).limit(limit))
     
-    def get_sros_by_diagram(self, diagram_id: str) -> List[models.SubjectRelationshipObject]:
-        return self.db.query(models.SubjectRelationshipObject)\
-            .filter(models.SubjectRelationshipObject.diagram_id == diagram_id).all()
+    def _sro_load_options(self, with_related: bool) -> List[Any]:
+        # with_related: subject / relationship / object in 3 batched SELECTs instead of
+        # lazy loads per row; raiseload("*") then makes any other lazy load fail loudly.
+        # Without it relationships keep their default lazy loading.
+        if not with_related:
+            return []
+        return [
+            selectinload(models.SubjectRelationshipObject.subject),
+            selectinload(models.SubjectRelationshipObject.relationship),
+            selectinload(models.SubjectRelationshipObject.object_rel),
+            raiseload("*"),
+        ]
+
+    def get_sros_by_diagram(self, diagram_id: str, with_related: bool = False, limit: int = 1000,
+                            after_id: Optional[int] = None) -> List[Any]:
+        """Column mappings by default; ORM objects only when with_related needs the relationships.
+        One page of at most limit rows ordered by id; pass the last id as after_id for the next page."""
+        sro = models.SubjectRelationshipObject
+        conditions = [sro.diagram_id == diagram_id]
+        if after_id is not None:
+            conditions.append(sro.id > after_id)
+        if not with_related:
+            return self._read_many(
+                select(*sro.__table__.c).where(*conditions).order_by(sro.id).limit(limit)
+            )
+        return self.db.query(sro)\
+            .options(*self._sro_load_options(with_related))\
+            .filter(*conditions)\
+            .order_by(sro.id).limit(limit).all()
+
+    def stream_sros(self, diagram_id: Optional[str] = None, batch_size: int = 1000) -> Iterator[Any]:
+        """Yield SRO rows from a server-side cursor, batch_size rows in memory at a time"""
+        sro = models.SubjectRelationshipObject
+        stmt = select(*sro.__table__.c).order_by(sro.id)
+        if diagram_id:
+            stmt = stmt.where(sro.diagram_id == diagram_id)
+        yield from self.db.execute(stmt.execution_options(yield_per=batch_size)).mappings()
     
-    def get_sros_by_subject(self, subject_id: int) -> List[models.SubjectRelationshipObject]:
+    def get_sros_by_subject(self, subject_id: int, with_related: bool = False) -> List[models.SubjectRelationshipObject]:
         return self.db.query(models.SubjectRelationshipObject)\
+            .options(*self._sro_load_options(with_related))\
             .filter(models.SubjectRelationshipObject.subject_id == subject_id).all()
     
-    def get_sros_by_object(self, object_id: int) -> List[models.SubjectRelationshipObject]:
+    def get_sros_by_object(self, object_id: int, with_related: bool = False) -> List[models.SubjectRelationshipObject]:
         return self.db.query(models.SubjectRelationshipObject)\
+            .options(*self._sro_load_options(with_related))\
             .filter(models.SubjectRelationshipObject.object_id == object_id).all()
     
     def search_sros(self, 
@@ -436,52 +712,42 @@ class PostgresService:
         subject_alias = aliased(models.Subject)
         object_alias = aliased(models.Subject)
 
-        query = self.db.query(
-            models.SubjectRelationshipObject,
+        sro = models.SubjectRelationshipObject
+
+        # Plain columns only: one statement, no per-row ORM entity hydration
+        stmt = select(
+            sro.id,
+            sro.subject_id,
             subject_alias.name.label('subject_name'),
+            sro.relationship_id,
             models.Relationship.name.label('relationship_name'),
-            object_alias.name.label('object_name')
+            sro.object_id,
+            object_alias.name.label('object_name'),
+            sro.diagram_id,
+            # DECIMAL -> float in SQL instead of a Python pass over the rows
+            func.coalesce(cast(sro.confidence_score, Float), 0.0).label('confidence_score'),
+            sro.context,
+            sro.created_at
         )\
-        .join(subject_alias, models.SubjectRelationshipObject.subject_id == subject_alias.id)\
-        .join(models.Relationship, models.SubjectRelationshipObject.relationship_id == models.Relationship.id)\
-        .join(object_alias, models.SubjectRelationshipObject.object_id == object_alias.id)\
+        .join(subject_alias, sro.subject_id == subject_alias.id)\
+        .join(models.Relationship, sro.relationship_id == models.Relationship.id)\
+        .join(object_alias, sro.object_id == object_alias.id)
         
         if subject_name:
-            query = query.filter(subject_alias.name.ilike(f"%{subject_name}%"))
+            stmt = stmt.where(subject_alias.name.ilike(_contains_pattern(subject_name)))
         if relationship_name:
-            query = query.filter(models.Relationship.name.ilike(f"%{relationship_name}%"))
+            stmt = stmt.where(models.Relationship.name.ilike(_contains_pattern(relationship_name)))
         if object_name:
-            query = query.filter(object_alias.name.ilike(f"%{object_name}%"))
+            stmt = stmt.where(object_alias.name.ilike(_contains_pattern(object_name)))
         if diagram_id:
-            query = query.filter(models.SubjectRelationshipObject.diagram_id == diagram_id)
+            stmt = stmt.where(sro.diagram_id == diagram_id)
         if min_confidence:
-            query = query.filter(models.SubjectRelationshipObject.confidence_score >= min_confidence)
-        
-        results = query.all()
+            stmt = stmt.where(sro.confidence_score >= min_confidence)
         
-        return [{
-            'id': result.SubjectRelationshipObject.id,
-            'subject_id': result.SubjectRelationshipObject.subject_id,
-            'subject_name': result.subject_name,
-            'relationship_id': result.SubjectRelationshipObject.relationship_id,
-            'relationship_name': result.relationship_name,
-            'object_id': result.SubjectRelationshipObject.object_id,
-            'object_name': result.object_name,
-            'diagram_id': result.SubjectRelationshipObject.diagram_id,
-            'confidence_score': float(result.SubjectRelationshipObject.confidence_score) if result.SubjectRelationshipObject.confidence_score else 0.0,
-            'context': result.SubjectRelationshipObject.context,
-            'created_at': result.SubjectRelationshipObject.created_at
-        } for result in results]
+        return self._read_many(stmt)
     
     def update_sro(self, sro_id: int, sro_update: schemas.SROUpdate) -> Optional[models.SubjectRelationshipObject]:
-        db_sro = self.get_sro(sro_id)
-        if db_sro:
-            update_data = sro_update.model_dump(exclude_unset=True)
-            for key, value in update_data.items():
-                setattr(db_sro, key, value)
-            self.db.commit()
-            self.db.refresh(db_sro)
-        return db_sro
+        return self._update_returning(models.SubjectRelationshipObject, sro_id, sro_update.model_dump(exclude_unset=True))
     
     def delete_sro(self, sro_id: int) -> bool:
         db_sro = self.get_sro(sro_id)
@@ -494,45 +760,11 @@ class PostgresService:
     # ========== SEARCH AND UTILITY METHODS ==========
     def search_categories_by_triple(self, subject: str, relationship: str, object: str) -> List[Dict[str, Any]]:
         """Tìm categories phù hợp với bộ ba (subject-relationship-object)"""
-        # Sử dụng raw SQL để search phức tạp
-        from sqlalchemy import text
-        
-        query = text("""
-        SELECT 
-            c.id as category_id,
-            c.name as category_name,
-            rc.name as root_category,
-            COUNT(sro.id) as match_count,
-            AVG(sro.confidence_score) as avg_confidence,
-            (COUNT(sro.id) * 0.5 + COALESCE(AVG(sro.confidence_score), 0) * 0.5) as relevance_score
-        FROM categories c
-        LEFT JOIN root_categories rc ON c.root_category_id = rc.id
-        LEFT JOIN diagrams d ON c.id = d.category_id
-        LEFT JOIN subject_relationship_object sro ON d.id = sro.diagram_id
-        LEFT JOIN subjects s1 ON sro.subject_id = s1.id
-        LEFT JOIN relationships r ON sro.relationship_id = r.id
-        LEFT JOIN subjects s2 ON sro.object_id = s2.id
-        WHERE (
-            s1.name ILIKE :subject_pattern
-            OR COALESCE(CAST(s1.synonyms AS TEXT), '') ILIKE :subject_synonyms_pattern
-        )
-        AND (r.name ILIKE :rel_pattern OR r.name IN (
-            SELECT name FROM relationships WHERE inverse_relationship ILIKE :rel_pattern
-        ))
-        AND (
-            s2.name ILIKE :object_pattern
-            OR COALESCE(CAST(s2.synonyms AS TEXT), '') ILIKE :object_synonyms_pattern
-        )
-        GROUP BY c.id, c.name, rc.name
-        ORDER BY relevance_score DESC
-        """)
-        
-        result = self.db.execute(query, {
-            'subject_pattern': f"%{subject}%",
-            'subject_synonyms_pattern': f"%{subject}%",
-            'rel_pattern': f"%{relationship}%",
-            'object_pattern': f"%{object}%",
-            'object_synonyms_pattern': f"%{object}%",
+        # Prebuilt statement with bound patterns: same SQL text on every call
+        result = self.db.execute(_TRIPLE_CATEGORY_SEARCH, {
+            'subject_pattern': _contains_pattern(subject),
+            'rel_pattern': _contains_pattern(relationship),
+            'object_pattern': _contains_pattern(object),
         }).fetchall()
         
         return [{
@@ -556,17 +788,20 @@ class PostgresService:
             .all()
         )
 
+        # All trigger codes in one round trip instead of one query per category
+        trigger_codes_by_category: Dict[int, List[str]] = {}
+        for category_id, trigger_code in (
+            self.db.query(models.Diagram.category_id, models.Diagram.trigger_code)
+            .filter(models.Diagram.trigger_code.isnot(None))
+            .distinct()
+            .all()
+        ):
+            if trigger_code:
+                trigger_codes_by_category.setdefault(category_id, []).append(trigger_code)
+
         matches: List[Dict[str, Any]] = []
         for category, root_category in categories:
-            trigger_codes = [
-                item[0]
-                for item in self.db.query(models.Diagram.trigger_code)
-                .filter(models.Diagram.category_id == category.id)
-                .filter(models.Diagram.trigger_code.isnot(None))
-                .distinct()
-                .all()
-                if item and item[0]
-            ]
+            trigger_codes = trigger_codes_by_category.get(category.id, [])
 
             haystack_parts = [
                 category.name or "",
@@ -779,16 +1014,22 @@ class PostgresService:
     
     def get_statistics(self) -> Dict[str, Any]:
         """Lấy thống kê tổng quan"""
-        total_categories = self.db.query(func.count(models.Category.id)).scalar() or 0
-        total_diagrams = self.db.query(func.count(models.Diagram.id)).scalar() or 0
-        total_subjects = self.db.query(func.count(models.Subject.id)).scalar() or 0
-        total_sros = self.db.query(func.count(models.SubjectRelationshipObject.id)).scalar() or 0
-        total_relationships = self.db.query(func.count(models.Relationship.id)).scalar() or 0
+        # All five counts as scalar subqueries of one SELECT (one round-trip)
+        def count_of(model):
+            return select(func.count()).select_from(model).scalar_subquery()
+
+        counts = self.db.query(
+            count_of(models.Category).label("total_categories"),
+            count_of(models.Diagram).label("total_diagrams"),
+            count_of(models.Subject).label("total_subjects"),
+            count_of(models.SubjectRelationshipObject).label("total_sros"),
+            count_of(models.Relationship).label("total_relationships")
+        ).one()
         
         return {
-            "total_categories": total_categories,
-            "total_diagrams": total_diagrams,
-            "total_subjects": total_subjects,
-            "total_relationships": total_relationships,
-            "total_sros": total_sros
+            "total_categories": counts.total_categories or 0,
+            "total_diagrams": counts.total_diagrams or 0,
+            "total_subjects": counts.total_subjects or 0,
+            "total_relationships": counts.total_relationships or 0,
+            "total_sros": counts.total_sros or 0
         }
\ No newline at end of file
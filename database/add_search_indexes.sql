@@ -0,0 +1,31 @@
+-- Indexes for PostgresService searches and lookups
+-- Safe to run multiple times
+
+-- Trigram indexes so ILIKE '%term%' can use an index instead of a seq scan
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_subjects_name_trgm
+    ON subjects USING gin (name gin_trgm_ops);
+-- Must match the expression used in the query exactly
+CREATE INDEX IF NOT EXISTS idx_subjects_synonyms_trgm
+    ON subjects USING gin ((COALESCE(CAST(synonyms AS TEXT), '')) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_relationships_name_trgm
+    ON relationships USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_relationships_inverse_trgm
+    ON relationships USING gin (inverse_relationship gin_trgm_ops);
+
+-- Prefix (autocomplete) search: lower(name) LIKE 'abc%'
+CREATE INDEX IF NOT EXISTS idx_subjects_lower_name
+    ON subjects (lower(name) text_pattern_ops);
+
+-- Foreign-key / attribute lookups; also declared on the SQLAlchemy models,
+-- but create_all only builds them together with new tables
+CREATE INDEX IF NOT EXISTS idx_sro_subject_id ON subject_relationship_object(subject_id);
+CREATE INDEX IF NOT EXISTS idx_sro_relationship_id ON subject_relationship_object(relationship_id);
+CREATE INDEX IF NOT EXISTS idx_sro_object_id ON subject_relationship_object(object_id);
+CREATE INDEX IF NOT EXISTS idx_sro_diagram_id ON subject_relationship_object(diagram_id);
+CREATE INDEX IF NOT EXISTS idx_diagrams_category_id ON diagrams(category_id);
+CREATE INDEX IF NOT EXISTS idx_categories_root_category_id ON categories(root_category_id);
+CREATE INDEX IF NOT EXISTS idx_root_subjects_level ON root_subjects(level);
+CREATE INDEX IF NOT EXISTS idx_subjects_root_subject_id_id ON subjects(root_subject_id, id);
+CREATE INDEX IF NOT EXISTS idx_relationships_semantic_type ON relationships(semantic_type);
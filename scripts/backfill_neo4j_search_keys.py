@@ -0,0 +1,21 @@
+"""One-off migration: set name_lc on Neo4j nodes and relationships
+written before the API maintained it. Safe to re-run; only rows missing the keys are touched."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.neo4j_conn import close_neo4j_driver  # noqa: E402
+from app.services.neo4j_service import Neo4jService  # noqa: E402
+
+
+def main() -> None:
+    try:
+        Neo4jService().backfill_search_keys()
+        print("Neo4j search key backfill done")
+    finally:
+        close_neo4j_driver()
+
+
+if __name__ == "__main__":
+    main()